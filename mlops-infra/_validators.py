@@ -0,0 +1,91 @@
+"""
+Shared file validators for validate_config.py and validate_simple.py.
+Standard library only, so validate_simple.py stays dependency-free.
+"""
+
+import json
+import mmap
+import os
+import re
+from collections import Counter
+from contextlib import nullcontext
+from functools import cache
+
+# HCL syntax characters, tallied in one scan over the mapped file
+_HCL_SYNTAX_RE = re.compile(rb'[{}"]')
+
+# A FROM instruction at the start of any line, case-insensitive like Docker
+_FROM_RE = re.compile(rb'(?im)^\s*FROM\s')
+
+# Optional C-backed JSON parser; orjson.JSONDecodeError subclasses json's
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+def map_file(f):
+    """Map an open binary file read-only; empty files cannot be mapped and give b''"""
+    if os.fstat(f.fileno()).st_size == 0:
+        return nullcontext(b'')
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+# Validators are cached per path: files do not change during a single run
+
+@cache
+def validate_json_file(filepath):
+    """Validate JSON file syntax"""
+    try:
+        with open(filepath, 'rb') as f:
+            _json_loads(f.read())
+        return True, "Valid JSON"
+    except json.JSONDecodeError as e:
+        return False, f"JSON Error: {e}"
+    except Exception as e:
+        return False, f"File Error: {e}"
+
+@cache
+def validate_hcl_file(filepath):
+    """Basic HCL file validation (syntax check)"""
+    try:
+        # Scan the mapped pages directly rather than copying the file into a str
+        with open(filepath, 'rb') as f, map_file(f) as content:
+            counts = Counter(_HCL_SYNTAX_RE.findall(content))
+        
+        # Basic syntax checks
+        if counts[b'{'] != counts[b'}']:
+            return False, "Unmatched braces in HCL file"
+        
+        if counts[b'"'] % 2 != 0:
+            return False, "Unmatched quotes in HCL file"
+        
+        return True, "Basic HCL syntax appears valid"
+    except Exception as e:
+        return False, f"File Error: {e}"
+
+@cache
+def validate_python_file(filepath):
+    """Validate Python file syntax"""
+    try:
+        # compile() reads the mapped bytes and decodes per the source's own encoding
+        with open(filepath, 'rb') as f, map_file(f) as content:
+            compile(content, filepath, 'exec', dont_inherit=True)
+        return True, "Valid Python syntax"
+    except SyntaxError as e:
+        return False, f"Python Syntax Error: {e}"
+    except Exception as e:
+        return False, f"File Error: {e}"
+
+@cache
+def validate_dockerfile(filepath):
+    """Basic Dockerfile validation"""
+    try:
+        with open(filepath, 'rb') as f, map_file(f) as content:
+            has_from = _FROM_RE.search(content) is not None
+        
+        if not has_from:
+            return False, "Missing FROM instruction"
+        
+        return True, "Basic Dockerfile structure valid"
+    except Exception as e:
+        return False, f"File Error: {e}"
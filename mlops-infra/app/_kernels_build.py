@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Ahead-of-time build of the ML training metric kernels
+Compiles the Numba kernel from train.py into the train_kernels extension
+module so short runs and CI skip the JIT cold-start entirely.
+
+Usage: python _kernels_build.py
+"""
+
+import os
+
+from numba.pycc import CC
+
+from train import _compute_metrics_core
+
+cc = CC('train_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Export the plain Python body; pycc compiles it in nopython mode
+cc.export('compute_metrics', 'f8[:,:](i8, f8[:,:])')(_compute_metrics_core.py_func)
+
+if __name__ == "__main__":
+    cc.compile()
@@ -0,0 +1,36 @@
+"""
+Shared pytest configuration for ML Training Application tests
+"""
+
+import os
+
+import pytest
+
+# Run Numba kernels as plain Python so tests skip compilation and coverage
+# counts kernel lines. Export NUMBA_DISABLE_JIT=0 to exercise the JIT build.
+os.environ.setdefault('NUMBA_DISABLE_JIT', '1')
+
+# Skip the simulated per-epoch training time
+os.environ.setdefault('TRAINING_SLEEP_SCALE', '0')
+
+
+def pytest_configure(config):
+    """Register custom markers."""
+    config.addinivalue_line("markers", "jit: runs a Numba kernel with JIT compilation enabled")
+
+
+@pytest.fixture(autouse=True)
+def clear_env_cache():
+    """Drop cached get_env_int lookups so patched environments take effect."""
+    from train import _env_cache_clear
+    _env_cache_clear()
+    yield
+    _env_cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def metrics_path(tmp_path, monkeypatch):
+    """Stream training metrics to a per-test file instead of /tmp."""
+    path = tmp_path / 'training_metrics.jsonl'
+    monkeypatch.setenv('METRICS_PATH', str(path))
+    return path
@@ -8,10 +8,13 @@ import json
 import tempfile
 import os
 from unittest.mock import Mock, patch, MagicMock
-from http.server import HTTPServer
 import threading
 import time
-import requests
+import http.client
+import gzip
+import queue
+import numpy as np
+from datetime import datetime
 
 # Import modules to test (adjust imports based on actual structure)
 import sys
@@ -23,10 +26,28 @@ from train import (
     validate_model_name, 
     validate_training_epochs,
     get_env_int,
+    get_env_sleep_scale,
+    _env_cache_clear,
     HealthCheckHandler,
-    HealthCheckServer
+    HealthCheckServer,
+    METRIC_FIELDS,
+    _compute_metrics_core,
+    _compute_metrics_parallel
 )
 
+# Pure-Python kernel body always; the compiled dispatcher only when JIT is enabled
+KERNEL_VARIANTS = [
+    pytest.param(getattr(_compute_metrics_core, 'py_func', _compute_metrics_core), id='python')
+]
+if hasattr(_compute_metrics_core, 'py_func'):
+    KERNEL_VARIANTS.append(pytest.param(_compute_metrics_core, id='jit', marks=pytest.mark.jit))
+
+PARALLEL_KERNEL_VARIANTS = [
+    pytest.param(getattr(_compute_metrics_parallel, 'py_func', _compute_metrics_parallel), id='python')
+]
+if hasattr(_compute_metrics_parallel, 'py_func'):
+    PARALLEL_KERNEL_VARIANTS.append(pytest.param(_compute_metrics_parallel, id='jit', marks=pytest.mark.jit))
+
 class TestValidationFunctions:
     """Test validation functions."""
     
@@ -53,6 +74,7 @@ class TestValidationFunctions:
             "model with spaces",  # Spaces
             "model@domain",  # Special characters
             "model.name",  # Dots
+            "model-name\n",  # Trailing newline
         ]
         
         for name in invalid_names:
@@ -107,13 +129,79 @@ class TestValidationFunctions:
         result = get_env_int("TEST_ENV_INT", 42)
         assert result == 25
     
+    def test_get_env_int_cached(self):
+        """Test get_env_int parses each variable once until the cache is cleared."""
+        with patch.dict(os.environ, {'TEST_ENV_CACHED': '7'}):
+            assert get_env_int("TEST_ENV_CACHED", 42) == 7
+        
+        # Still served from the cache after the variable is gone
+        assert get_env_int("TEST_ENV_CACHED", 42) == 7
+        
+        _env_cache_clear()
+        assert get_env_int("TEST_ENV_CACHED", 42) == 42
+    
     @patch.dict(os.environ, {'TEST_ENV_INVALID': 'not_a_number'})
+    @pytest.mark.parametrize('raw, expected', [('0.5', 0.5), ('0', 0.0), ('fast', 1.0), ('-1', 1.0), ('nan', 1.0)])
+    def test_get_env_sleep_scale(self, raw, expected):
+        """Test TRAINING_SLEEP_SCALE falls back to 1.0 instead of raising on bad values."""
+        with patch.dict(os.environ, {'TRAINING_SLEEP_SCALE': raw}):
+            assert get_env_sleep_scale() == expected
+    
     def test_get_env_int_invalid_value(self):
         """Test get_env_int with invalid environment value."""
         result = get_env_int("TEST_ENV_INVALID", 42)
         assert result == 42  # Should fall back to default
 
 
+class TestMetricKernel:
+    """Test the metric generation kernel."""
+    
+    @pytest.mark.parametrize('fn', KERNEL_VARIANTS)
+    def test_compute_metrics_core_shape_and_ranges(self, fn):
+        """Test kernel output layout and value ranges."""
+        rands = np.random.random((10, 6))
+        table = fn(10, rands)
+        
+        assert table.shape == (10, len(METRIC_FIELDS))
+        accuracy, loss, cpu, memory, gpu = table.T
+        assert np.all((accuracy >= 0.55) & (accuracy <= 0.95))
+        assert np.all(loss >= 0.1)
+        assert np.all((cpu >= 60) & (cpu <= 90))
+        assert np.all((memory >= 70) & (memory <= 85))
+        assert np.all((gpu == 0) | ((gpu >= 80) & (gpu <= 95)))
+    
+    @pytest.mark.parametrize('fn', KERNEL_VARIANTS)
+    def test_compute_metrics_core_values(self, fn):
+        """Test kernel output for fixed random draws."""
+        rands = np.full((3, 6), 0.5)
+        table = fn(3, rands)
+        
+        # Noise terms are centred at 0.5, so only the trend remains
+        assert table[2, 0] == 0.9
+        assert table[2, 1] == 0.3
+        assert table[0, 2] == 75.0
+        assert table[0, 3] == 77.5
+        assert table[0, 4] == 87.5
+    
+    @pytest.mark.parametrize('fn', PARALLEL_KERNEL_VARIANTS)
+    def test_compute_metrics_parallel_matches_sequential(self, fn):
+        """Test the parallel kernel produces the same table as the sequential one."""
+        rands = np.random.random((50, 6))
+        
+        expected = getattr(_compute_metrics_core, 'py_func', _compute_metrics_core)(50, rands)
+        np.testing.assert_array_equal(fn(50, rands), expected)
+    
+    @patch.dict(os.environ, {'PARALLEL_METRICS_MIN_EPOCHS': '4'})
+    def test_parallel_kernel_used_above_threshold(self):
+        """Test trainers at or above the epoch threshold use the parallel kernel."""
+        with patch('train._compute_metrics_parallel', wraps=_compute_metrics_parallel) as parallel:
+            MLTrainer(model_name="test-model", epochs=3).generate_training_metrics(1)
+            assert not parallel.called
+            
+            MLTrainer(model_name="test-model", epochs=4).generate_training_metrics(1)
+            assert parallel.called
+
+
 class TestMLTrainer:
     """Test MLTrainer class."""
     
@@ -125,7 +213,8 @@ class TestMLTrainer:
         """Test MLTrainer initialization."""
         assert self.trainer.model_name == "test-model"
         assert self.trainer.epochs == 3
-        assert self.trainer.metrics == []
+        assert self.trainer.epochs_completed == 0
+        assert len(self.trainer.metrics) == 3
         assert hasattr(self.trainer, 'registry')
         assert hasattr(self.trainer, 'accuracy_gauge')
         assert hasattr(self.trainer, 'loss_gauge')
@@ -138,7 +227,7 @@ class TestMLTrainer:
         required_fields = [
             'epoch', 'accuracy', 'loss', 'learning_rate',
             'cpu_usage_percent', 'memory_usage_percent', 
-            'gpu_usage_percent', 'timestamp', 'batch_size', 'model_name'
+            'gpu_usage_percent', 'timestamp_ns', 'batch_size', 'model_name'
         ]
         
         for field in required_fields:
@@ -151,13 +240,53 @@ class TestMLTrainer:
         assert metrics['model_name'] == "test-model"
         assert metrics['batch_size'] == 32
     
+    def test_learning_rate_schedule(self):
+        """Test the precomputed learning rate decays every 3 epochs."""
+        trainer = MLTrainer(model_name="test-model", epochs=7)
+        learning_rates = [trainer.generate_training_metrics(epoch)['learning_rate'] for epoch in range(1, 8)]
+        
+        expected = [0.001 * (0.9 ** (epoch // 3)) for epoch in range(1, 8)]
+        assert learning_rates == pytest.approx(expected)
+    
+    @patch.dict(os.environ, {'TRAINING_SEED': '1234'})
+    def test_generate_training_metrics_seeded(self):
+        """Test a fixed seed reproduces the same metrics."""
+        _env_cache_clear()  # setup_method already cached TRAINING_SEED as unset
+        first = MLTrainer(model_name="test-model", epochs=3)
+        second = MLTrainer(model_name="test-model", epochs=3)
+        
+        assert first.seed == second.seed == 1234
+        for epoch in (1, 2, 3):
+            a = first.generate_training_metrics(epoch)
+            b = second.generate_training_metrics(epoch)
+            a.pop('timestamp_ns')
+            b.pop('timestamp_ns')
+            assert a == b
+        assert first._epoch_durations == second._epoch_durations
+        assert first._validation_factors == second._validation_factors
+    
+    def test_pregenerated_simulation_draws(self):
+        """Test epoch durations and validation factors are drawn once per run within range."""
+        self.trainer._pregenerate_metrics()
+        
+        assert len(self.trainer._epoch_durations) == self.trainer.epochs
+        assert all(1.0 <= d <= 3.0 for d in self.trainer._epoch_durations)
+        assert all(0.95 <= f <= 1.05 for f in self.trainer._validation_factors)
+    
     def test_train_epoch(self):
         """Test single epoch training."""
         with patch.object(self.trainer, 'push_metrics_to_prometheus'):
             metrics = self.trainer.train_epoch(epoch=1)
             
-            assert len(self.trainer.metrics) == 1
-            assert self.trainer.metrics[0] == metrics
+            assert self.trainer.epochs_completed == 1
+            assert self.trainer.metrics[0]['epoch'] == 1
+            assert self.trainer.metrics[0]['accuracy'] == metrics['accuracy']
+            
+            saved = self.trainer.metrics_as_list()
+            assert len(saved) == 1
+            assert saved[0]['accuracy'] == metrics['accuracy']
+            saved_ts = datetime.fromisoformat(saved[0]['timestamp']).timestamp()
+            assert saved_ts == pytest.approx(metrics['timestamp_ns'] / 1e9, abs=1e-3)
             assert metrics['epoch'] == 1
     
     @patch('train.push_to_gateway')
@@ -167,10 +296,116 @@ class TestMLTrainer:
         
         metrics = self.trainer.generate_training_metrics(epoch=1)
         self.trainer.push_metrics_to_prometheus(metrics)
+        self.trainer._flush_metrics()
         
         # Verify push_to_gateway was called
         assert mock_push.called
     
+    @patch('train.push_to_gateway')
+    def test_push_metrics_to_prometheus_batched(self, mock_push):
+        """Test metrics pushed within the flush interval are batched into one push."""
+        mock_push.return_value = None
+        
+        for epoch in (1, 2):
+            self.trainer.push_metrics_to_prometheus(self.trainer.generate_training_metrics(epoch))
+        
+        # Nothing is sent until an interval elapses or a flush is forced
+        assert mock_push.call_count == 0
+        assert len(self.trainer._pending_metrics) == 2
+        
+        self.trainer._flush_metrics()
+        
+        assert mock_push.call_count == 1
+        assert self.trainer._pending_metrics == []
+    
+    @patch('train.push_to_gateway')
+    def test_flush_updates_labelled_metrics(self, mock_push):
+        """Test a flush sets the labelled gauges from the latest epoch."""
+        mock_push.return_value = None
+        
+        for epoch in (1, 2):
+            self.trainer.push_metrics_to_prometheus(self.trainer.generate_training_metrics(epoch))
+        self.trainer._flush_metrics()
+        
+        labels = {'model_name': 'test-model', 'model_version': self.trainer.model_version}
+        latest = self.trainer.generate_training_metrics(2)
+        registry = self.trainer.registry
+        assert registry.get_sample_value('ml_training_accuracy', labels) == latest['accuracy']
+        assert registry.get_sample_value('ml_training_loss', labels) == latest['loss']
+        assert registry.get_sample_value('ml_training_epochs_total', labels) == 2
+    
+    @patch('train.push_to_gateway')
+    def test_push_metrics_every_push_interval(self, mock_push):
+        """Test pushes happen every PUSH_INTERVAL_EPOCHS epochs and on the last epoch."""
+        mock_push.return_value = None
+        
+        with patch.dict(os.environ, {'PUSH_INTERVAL_EPOCHS': '2'}):
+            _env_cache_clear()
+            trainer = MLTrainer(model_name="test-model", epochs=5)
+        
+        pushed_after = []
+        for epoch in range(1, 6):
+            trainer.push_metrics_to_prometheus(trainer.generate_training_metrics(epoch))
+            pushed_after.append(mock_push.call_count)
+        
+        assert pushed_after == [0, 1, 1, 2, 3]
+        assert trainer._pending_metrics == []
+    
+    @patch('train.push_to_gateway')
+    def test_close_flushes_pending_metrics(self, mock_push):
+        """Test close pushes pending epochs and drops the atexit flush hook."""
+        self.trainer.push_metrics_to_prometheus(self.trainer.generate_training_metrics(epoch=1))
+        
+        with patch('train.atexit.unregister') as mock_unregister:
+            self.trainer.close()
+        
+        mock_unregister.assert_called_once_with(self.trainer._flush_metrics)
+        assert mock_push.call_count == 1
+        assert self.trainer._pending_metrics == []
+    
+    @patch('train.push_to_gateway')
+    def test_flush_skips_cleared_registry(self, mock_push):
+        """Test a cleared registry is never pushed, since an empty PUT deletes the job's metrics."""
+        self.trainer.push_metrics_to_prometheus(self.trainer.generate_training_metrics(epoch=1))
+        self.trainer.registry._collector_to_names.clear()
+        self.trainer.registry._names_to_collectors.clear()
+        
+        self.trainer._flush_metrics()
+        
+        assert mock_push.call_count == 0
+        assert self.trainer._pending_metrics == []
+    
+    def test_push_uses_keepalive_session(self):
+        """Test pushes go through the trainer's shared requests session."""
+        with patch.object(self.trainer._session, 'request') as mock_request:
+            mock_request.return_value.status_code = 200
+            
+            self.trainer.push_metrics_to_prometheus(self.trainer.generate_training_metrics(epoch=1))
+            self.trainer._flush_metrics()
+            self.trainer.push_metrics_to_prometheus(self.trainer.generate_training_metrics(epoch=2))
+            self.trainer._flush_metrics()
+        
+        assert mock_request.call_count == 2
+        method, url = mock_request.call_args[0]
+        assert method == 'PUT'
+        assert url.startswith(self.trainer.pushgateway_url)
+        assert mock_request.call_args[1]['headers']['Content-Encoding'] == 'gzip'
+        assert b'ml_training_accuracy' in gzip.decompress(mock_request.call_args[1]['data'])
+    
+    @patch.dict(os.environ, {'PUSHGATEWAY_GZIP': '0'})
+    def test_push_without_gzip(self):
+        """Test PUSHGATEWAY_GZIP=0 sends the plain text exposition format."""
+        _env_cache_clear()
+        trainer = MLTrainer(model_name="test-model", epochs=3)
+        
+        with patch.object(trainer._session, 'request') as mock_request:
+            mock_request.return_value.status_code = 200
+            trainer.push_metrics_to_prometheus(trainer.generate_training_metrics(epoch=1))
+            trainer._flush_metrics()
+        
+        assert 'Content-Encoding' not in mock_request.call_args[1]['headers']
+        assert b'ml_training_accuracy' in mock_request.call_args[1]['data']
+    
     @patch('train.push_to_gateway')
     def test_push_metrics_to_prometheus_failure(self, mock_push):
         """Test metrics push with retries on failure."""
@@ -178,50 +413,267 @@ class TestMLTrainer:
         mock_push.side_effect = ConnectionError("Connection failed")
         
         metrics = self.trainer.generate_training_metrics(epoch=1)
+        self.trainer.push_metrics_to_prometheus(metrics)
         
         # Should not raise exception, just log errors
-        self.trainer.push_metrics_to_prometheus(metrics)
+        with patch('train._time_sleep'):  # Skip backoff delays
+            self.trainer._flush_metrics()
         
-        # Should have retried 3 times
+        # Should have retried 3 times, once per batch
         assert mock_push.call_count == 3
+        assert self.trainer._pending_metrics == []
+    
+    @pytest.mark.parametrize('status_code, expected_calls', [(404, 1), (422, 1), (429, 3), (503, 3)])
+    @patch('train.push_to_gateway')
+    def test_push_http_errors_retry_only_when_retriable(self, mock_push, status_code, expected_calls):
+        """Test client errors fail fast while server errors and throttling are retried."""
+        from requests import Response
+        from requests.exceptions import HTTPError
+        response = Response()
+        response.status_code = status_code
+        mock_push.side_effect = HTTPError(f"{status_code} error", response=response)
+        
+        self.trainer.push_metrics_to_prometheus(self.trainer.generate_training_metrics(epoch=1))
+        with patch('train._time_sleep') as mock_sleep:
+            self.trainer._flush_metrics()
+        
+        assert mock_push.call_count == expected_calls
+        assert mock_sleep.call_count == expected_calls - 1
+    
+    @patch('train.push_to_gateway')
+    def test_push_invalid_url_not_retried(self, mock_push):
+        """Test a malformed Pushgateway URL fails without backoff."""
+        from requests.exceptions import MissingSchema
+        mock_push.side_effect = MissingSchema("No connection adapters were found")
+        
+        self.trainer.push_metrics_to_prometheus(self.trainer.generate_training_metrics(epoch=1))
+        with patch('train._time_sleep') as mock_sleep:
+            self.trainer._flush_metrics()
+        
+        assert mock_push.call_count == 1
+        mock_sleep.assert_not_called()
+    
+    @patch('train.push_to_gateway')
+    def test_push_retry_backoff_capped_with_jitter(self, mock_push):
+        """Test retry delays grow exponentially, stop at the cap and add bounded jitter."""
+        from requests.exceptions import ConnectionError
+        mock_push.side_effect = ConnectionError("Connection failed")
+        
+        with patch.dict(os.environ, {'PUSHGATEWAY_MAX_RETRIES': '5', 'PUSHGATEWAY_RETRY_BASE_DELAY': '2',
+                                     'PUSHGATEWAY_RETRY_MAX_DELAY': '5', 'PUSHGATEWAY_RETRY_JITTER_PERCENT': '50'}):
+            _env_cache_clear()
+            trainer = MLTrainer(model_name="test-model", epochs=3)
+        trainer.push_metrics_to_prometheus(trainer.generate_training_metrics(epoch=1))
+        with patch('train._time_sleep') as mock_sleep:
+            trainer._flush_metrics()
+        trainer.close()
+        
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        assert mock_push.call_count == 5
+        assert len(delays) == 4
+        for delay, base in zip(delays, (2, 4, 5, 5)):
+            assert base <= delay <= base * 1.5
     
     def test_save_metrics(self):
         """Test metrics saving to file."""
         # Add some test metrics
-        self.trainer.metrics = [
-            {'epoch': 1, 'accuracy': 0.8, 'loss': 0.2},
-            {'epoch': 2, 'accuracy': 0.85, 'loss': 0.15}
-        ]
+        with patch.object(self.trainer, 'push_metrics_to_prometheus'):
+            self.trainer.train_epoch(epoch=1)
+            self.trainer.train_epoch(epoch=2)
         
-        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.json') as f:
+        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.jsonl') as f:
             filepath = f.name
         
         try:
             self.trainer.save_metrics(filepath)
             
-            # Verify file was created and contains correct data
-            with open(filepath, 'r') as f:
-                saved_metrics = json.load(f)
+            # Verify file was created and contains one JSON record per line
+            with open(filepath, 'rb') as f:
+                saved_metrics = [json.loads(line) for line in f]
             
-            assert saved_metrics == self.trainer.metrics
+            assert saved_metrics == self.trainer.metrics_as_list()
+            assert [m['epoch'] for m in saved_metrics] == [1, 2]
         finally:
             os.unlink(filepath)
     
+    def test_save_metrics_flushes_stream(self):
+        """Test saving to the streaming path flushes the open file instead of rewriting it."""
+        with patch.object(self.trainer, 'push_metrics_to_prometheus'):
+            self.trainer.train_epoch(epoch=1)
+            self.trainer.train_epoch(epoch=2)
+        
+        with patch('train.open') as mock_open:
+            self.trainer.save_metrics()
+        mock_open.assert_not_called()
+        
+        # The stream stays open for further epochs but its contents are on disk
+        assert self.trainer._metrics_fp is not None
+        with open(self.trainer.metrics_path, 'rb') as f:
+            streamed = [json.loads(line) for line in f]
+        assert streamed == self.trainer.metrics_as_list()
+    
     @patch('train.push_to_gateway')
     def test_run_training_success(self, mock_push):
         """Test complete training run."""
         mock_push.return_value = None
         
-        with patch('time.sleep'):  # Speed up test
-            results = self.trainer.run_training()
+        results = self.trainer.run_training()
         
         assert results['status'] == 'completed'
         assert results['model_name'] == 'test-model'
         assert results['total_epochs'] == 3
-        assert len(self.trainer.metrics) == 3
+        assert self.trainer.epochs_completed == 3
+        assert results['best_accuracy'] == self.trainer.metrics['accuracy'].max()
+        assert results['final_loss'] == self.trainer.metrics['loss'][-1]
+        assert self.trainer.last_metrics['epoch'] == 3
         assert 'final_accuracy' in results
         assert 'training_time_seconds' in results
     
+    @patch('train.push_to_gateway')
+    def test_run_training_pushes_off_training_thread(self, mock_push):
+        """Test pushes run on the pusher thread and are drained before run_training returns."""
+        push_threads = []
+        mock_push.side_effect = lambda *args, **kwargs: push_threads.append(threading.current_thread().name)
+        
+        results = self.trainer.run_training()
+        
+        assert results['status'] == 'completed'
+        assert push_threads == ['pushgateway-pusher']
+        assert self.trainer._pusher_thread is None
+    
+    @patch('train.push_to_gateway')
+    def test_flush_does_not_wait_for_push(self, mock_push):
+        """Test a slow Pushgateway does not block the flush, and a full queue drops pushes."""
+        started, release = threading.Event(), threading.Event()
+        
+        def slow_push(*args, **kwargs):
+            started.set()
+            release.wait(5)
+        
+        mock_push.side_effect = slow_push
+        self.trainer._push_queue = queue.Queue(maxsize=1)
+        self.trainer._start_pusher()
+        
+        try:
+            for epoch in (1, 2, 3):
+                self.trainer.push_metrics_to_prometheus(self.trainer.generate_training_metrics(epoch))
+                self.trainer._flush_metrics()
+                if epoch == 1:
+                    assert started.wait(5)
+            assert not release.is_set()
+        finally:
+            release.set()
+            self.trainer._stop_pusher()
+        
+        # One push in flight, one queued, the third dropped
+        assert mock_push.call_count == 2
+    
+    @patch('train.push_to_gateway')
+    def test_background_push_uses_registry_snapshot(self, mock_push):
+        """Test queued pushes carry the values from flush time, not later updates."""
+        self.trainer._start_pusher()
+        release = threading.Event()
+        mock_push.side_effect = lambda *args, **kwargs: release.wait(5)
+        
+        try:
+            self.trainer.push_metrics_to_prometheus(self.trainer.generate_training_metrics(1))
+            self.trainer._flush_metrics()
+            # Training moves on before the push has been serialized
+            self.trainer._accuracy_child.set(-1.0)
+        finally:
+            release.set()
+            self.trainer._stop_pusher()
+        
+        pushed = mock_push.call_args[1]['registry']
+        assert pushed is not self.trainer.registry
+        labels = {'model_name': 'test-model', 'model_version': self.trainer.model_version}
+        expected = self.trainer.generate_training_metrics(1)['accuracy']
+        assert pushed.get_sample_value('ml_training_accuracy', labels) == expected
+    
+    def test_run_training_streams_metrics(self):
+        """Test epochs completed before a failure are already on disk."""
+        generate = self.trainer.generate_training_metrics
+        
+        def fail_on_second_epoch(epoch):
+            if epoch == 2:
+                raise Exception("Test error")
+            return generate(epoch)
+        
+        with patch.object(self.trainer, 'push_metrics_to_prometheus'), \
+                patch.object(self.trainer, 'generate_training_metrics', side_effect=fail_on_second_epoch):
+            results = self.trainer.run_training()
+        
+        assert results['status'] == 'failed'
+        assert self.trainer._metrics_fp is None
+        
+        with open(self.trainer.metrics_path, 'rb') as f:
+            streamed = [json.loads(line) for line in f]
+        
+        assert streamed == self.trainer.metrics_as_list()
+        assert [m['epoch'] for m in streamed] == [1]
+    
+    @patch('train.push_to_gateway')
+    def test_run_training_replaces_previous_metrics_file(self, mock_push):
+        """Test a run's metrics file holds only that run's epochs."""
+        with open(self.trainer.metrics_path, 'wb') as f:
+            f.write(b'{"epoch": 99, "model_name": "previous-run"}\n')
+        
+        self.trainer.run_training()
+        
+        with open(self.trainer.metrics_path, 'rb') as f:
+            streamed = [json.loads(line) for line in f]
+        
+        assert [m['epoch'] for m in streamed] == [1, 2, 3]
+    
+    @patch.dict(os.environ, {'SIMULATE_EPOCH_SLEEP': '0'})
+    def test_train_epoch_without_simulated_sleep(self):
+        """Test SIMULATE_EPOCH_SLEEP=0 forces the sleep scale to 0, skipping the epoch wait."""
+        _env_cache_clear()
+        with patch('train.SLEEP_SCALE', 1.0):
+            trainer = MLTrainer(model_name="test-model", epochs=2)
+        
+        with patch.object(trainer._stop, 'wait', wraps=trainer._stop.wait) as mock_wait, \
+                patch.object(trainer, 'push_metrics_to_prometheus'):
+            trainer.train_epoch(epoch=1)
+        
+        assert trainer.sleep_scale == 0.0
+        mock_wait.assert_called_once_with(0)
+        trainer.close()
+    
+    @patch('train.push_to_gateway')
+    def test_run_training_stopped(self, mock_push):
+        """Test a stopped trainer cancels the run at the epoch wait."""
+        self.trainer.stop()
+        
+        with pytest.raises(KeyboardInterrupt):
+            self.trainer.run_training()
+        
+        assert self.trainer.epochs_completed == 0
+    
+    @patch('train.push_to_gateway')
+    def test_run_training_failure_pushes_completed_epochs(self, mock_push):
+        """Test epochs completed before a failure are pushed even between push intervals."""
+        with patch.dict(os.environ, {'PUSH_INTERVAL_EPOCHS': '5'}):
+            _env_cache_clear()
+            trainer = MLTrainer(model_name="test-model", epochs=7)
+        train_epoch = trainer.train_epoch
+        
+        def fail_on_third_epoch(epoch):
+            if epoch == 3:
+                raise RuntimeError("Test error")
+            return train_epoch(epoch)
+        
+        with patch.object(trainer, 'train_epoch', side_effect=fail_on_third_epoch):
+            results = trainer.run_training()
+        
+        assert results['status'] == 'failed'
+        assert mock_push.call_count == 1
+        labels = {'model_name': 'test-model', 'model_version': trainer.model_version}
+        pushed = mock_push.call_args[1]['registry']
+        assert pushed.get_sample_value('ml_training_epochs_total', labels) == 2
+        assert trainer._pending_metrics == []
+        trainer.close()
+    
     def test_run_training_with_exception(self):
         """Test training run with exception."""
         with patch.object(self.trainer, 'train_epoch', side_effect=Exception("Test error")):
@@ -232,6 +684,13 @@ class TestMLTrainer:
         assert results['error'] == 'Test error'
 
 
+def http_get(port, path):
+    """Issue a GET against the local health check server."""
+    conn = http.client.HTTPConnection('localhost', port, timeout=5)
+    conn.request('GET', path)
+    return conn.getresponse()
+
+
 class TestHealthCheckServer:
     """Test health check server functionality."""
     
@@ -259,32 +718,70 @@ class TestHealthCheckServer:
             assert self.health_server.thread.is_alive()
             
             # Get the actual port
-            port = self.health_server.server.server_address[1]
+            port = self.health_server.port
             
             # Test health endpoint
-            response = requests.get(f"http://localhost:{port}/health", timeout=5)
-            assert response.status_code == 200
+            response = http_get(port, '/health')
+            assert response.status == 200
             
-            health_data = response.json()
+            health_data = json.loads(response.read())
             assert health_data['status'] == 'healthy'
             assert health_data['model_name'] == 'test-model'
             
         finally:
             self.health_server.stop()
     
+    def test_health_check_reflects_completed_epochs(self):
+        """Test the cached health payload is refreshed after each epoch."""
+        try:
+            self.health_server.start()
+            port = self.health_server.port
+            
+            with patch.object(self.trainer, 'push_metrics_to_prometheus'):
+                self.trainer.train_epoch(epoch=1)
+            
+            response = http_get(port, '/health')
+            assert response.getheader('Content-Type').startswith('application/json')
+            
+            health_data = json.loads(response.read())
+            assert health_data['epochs_completed'] == 1
+            assert health_data['total_epochs'] == 5
+            assert health_data['timestamp'] == pytest.approx(time.time(), abs=60)
+            
+        finally:
+            self.health_server.stop()
+    
     def test_health_check_404_endpoint(self):
         """Test non-existent endpoint returns 404."""
         try:
             self.health_server.start()
             time.sleep(0.1)
             
-            port = self.health_server.server.server_address[1]
+            port = self.health_server.port
             
-            response = requests.get(f"http://localhost:{port}/nonexistent", timeout=5)
-            assert response.status_code == 404
+            response = http_get(port, '/nonexistent')
+            assert response.status == 404
             
         finally:
             self.health_server.stop()
+    
+    def test_health_check_without_trainer(self):
+        """Test the server reports a placeholder payload when no trainer is attached."""
+        health_server = HealthCheckServer(None, port=0)
+        try:
+            health_server.start()
+            
+            health_data = json.loads(http_get(health_server.port, '/health').read())
+            assert health_data['model_name'] == 'unknown'
+            assert health_data['total_epochs'] == 0
+            assert health_data['timestamp'] > 0
+            
+            # Probes within the TTL reuse the serialized payload
+            repeat = json.loads(http_get(health_server.port, '/health').read())
+            assert repeat == health_data
+            
+        finally:
+            health_server.stop()
 
 
 class TestIntegration:
@@ -304,8 +801,7 @@ class TestIntegration:
             # Mock main function import and execution
             from train import main
             
-            with patch('time.sleep'):  # Speed up test
-                result = main()
+            result = main()
         
         assert result == 0  # Success exit code
     
@@ -5,55 +5,221 @@ This script simulates a machine learning training process with metrics logging.
 """
 
 import os
+import sys
 import time
-import random
 import json
 import logging
+import queue
+import atexit
+import gzip
+import random
 import re
 import threading
+import signal
+import asyncio
 from datetime import datetime
-from typing import Dict, List
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
+import numpy as np
+from aiohttp import web
 from prometheus_client import CollectorRegistry, Gauge, Counter, push_to_gateway
+import requests
 from requests.exceptions import RequestException, Timeout, ConnectionError
 
-# Configure logging
+try:
+    import orjson
+except ImportError:  # Optional C-accelerated JSON encoder
+    orjson = None
+
+def _dumps(obj) -> bytes:
+    """Encode an object as compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+def _dumps_line(record: Dict) -> bytes:
+    """Encode a record as one compact NDJSON line"""
+    return _dumps(record) + b'\n'
+
+try:
+    import uvloop
+except ImportError:  # Optional faster event loop for the health check server
+    uvloop = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional JIT compiler; kernels run as plain Python without it
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+    prange = range
+
+# Configure logging: callers only enqueue records, and a background
+# listener thread formats and writes them to stderr
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Final layout is applied by _log_handler
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    handlers=[_queue_handler]
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
-class HealthCheckHandler(BaseHTTPRequestHandler):
-    """HTTP handler for health check endpoint"""
+# Module-level bindings for clock/sleep functions called on every epoch,
+# saving an attribute lookup per call
+_monotonic = time.monotonic
+_time = time.time
+_time_ns = time.time_ns
+_time_sleep = time.sleep
+
+# Scales the simulated per-epoch training time (0 disables it, e.g. in tests).
+# SIMULATE_EPOCH_SLEEP=0 is a shorthand that forces the scale to 0 (benchmarks, CI)
+def get_env_sleep_scale() -> float:
+    """Read TRAINING_SLEEP_SCALE, falling back to 1.0 on a non-numeric or negative value"""
+    raw = os.getenv('TRAINING_SLEEP_SCALE', '1.0')
+    try:
+        scale = float(raw)
+    except ValueError:
+        scale = None
+    if scale is None or not 0 <= scale < float('inf'):
+        logger.warning("Invalid value for TRAINING_SLEEP_SCALE, using default: 1.0")
+        return 1.0
+    return scale
+
+SLEEP_SCALE = get_env_sleep_scale()
+
+# Per-epoch metrics record; MLTrainer.metrics is a structured array (one
+# packed column per field) rather than a list of dicts
+METRIC_DTYPE = np.dtype([
+    ('epoch', 'i4'),
+    ('accuracy', 'f8'),
+    ('loss', 'f8'),
+    ('learning_rate', 'f8'),
+    ('cpu_usage_percent', 'f8'),
+    ('memory_usage_percent', 'f8'),
+    ('gpu_usage_percent', 'f8'),
+    ('batch_size', 'i4'),
+    ('timestamp_ns', 'i8'),
+])
+
+# Model name rules, compiled once: allowed characters, and characters plus length
+# (used with fullmatch, so no anchors and no trailing-newline loophole)
+_MODEL_NAME_CHARS_RE = re.compile(r'[a-zA-Z0-9_-]+')
+_MODEL_NAME_RE = re.compile(r'[a-zA-Z0-9_-]{3,50}')
+
+# Client errors that can succeed on retry; any other 4xx fails fast
+_RETRIABLE_CLIENT_STATUS = frozenset({408, 429})
+
+# Column order of the array returned by _compute_metrics_core
+METRIC_FIELDS = (
+    "accuracy",
+    "loss",
+    "cpu_usage_percent",
+    "memory_usage_percent",
+    "gpu_usage_percent",
+)
+
+@njit(cache=True, nogil=True)
+def _fill_epoch_metrics(out, i, epochs, r):
+    """Compute one epoch's simulated metrics from its uniform [0, 1) samples into row i"""
+    progress = (i + 1) / epochs
+    
+    # Simulate improving accuracy and decreasing loss with some randomness
+    accuracy = min(0.95, 0.6 + progress * 0.3 + (r[0] * 0.1 - 0.05))
+    loss = max(0.1, 1.0 - progress * 0.7 + (r[1] * 0.2 - 0.1))
+    
+    # Simulate resource usage
+    cpu_usage = 60.0 + r[2] * 30.0
+    memory_usage = 70.0 + r[3] * 15.0
+    gpu_usage = 80.0 + r[5] * 15.0 if r[4] > 0.3 else 0.0
+    
+    out[i, 0] = round(accuracy, 4)
+    out[i, 1] = round(loss, 4)
+    out[i, 2] = round(cpu_usage, 2)
+    out[i, 3] = round(memory_usage, 2)
+    out[i, 4] = round(gpu_usage, 2)
+
+@njit(cache=True, nogil=True)
+def _compute_metrics_core(epochs, rands):
+    """Compute simulated metrics for every epoch from pre-drawn uniform [0, 1) samples"""
+    out = np.empty((epochs, len(METRIC_FIELDS)))
+    for i in range(epochs):
+        _fill_epoch_metrics(out, i, epochs, rands[i])
+    return out
+
+@njit(cache=True, nogil=True, parallel=True)
+def _compute_metrics_parallel(epochs, rands):
+    """Multi-threaded _compute_metrics_core; epochs are independent once samples are drawn"""
+    out = np.empty((epochs, len(METRIC_FIELDS)))
+    for i in prange(epochs):
+        _fill_epoch_metrics(out, i, epochs, rands[i])
+    return out
+
+try:
+    # Ahead-of-time compiled build of the kernel (see _kernels_build.py)
+    from train_kernels import compute_metrics as _compute_metrics
+except ImportError:
+    _compute_metrics = _compute_metrics_core
+
+def warmup():
+    """Compile the JIT kernels ahead of the first training run"""
+    _compute_metrics(1, np.random.random((1, 6)))
+    _compute_metrics_parallel(1, np.random.random((1, 6)))
+    logger.info("Metric kernels compiled")
+
+# /health payload served when no trainer is attached; only the timestamp varies
+_UNKNOWN_HEALTH = {
+    "status": "healthy",
+    "model_name": "unknown",
+    "epochs_completed": 0,
+    "total_epochs": 0,
+    "timestamp": 0.0
+}
+# Seconds a serialized trainerless payload is reused across probes
+_UNKNOWN_HEALTH_TTL = 1.0
+
+class RegistrySnapshot:
+    """Collector replaying metric families captured from a registry at one instant"""
     
-    def __init__(self, trainer_instance, *args, **kwargs):
+    def __init__(self, registry: CollectorRegistry):
+        self._families = list(registry.collect())
+    
+    def collect(self):
+        return self._families
+
+class HealthCheckHandler:
+    """aiohttp request handlers for the health check endpoint"""
+    
+    def __init__(self, trainer_instance):
         self.trainer = trainer_instance
-        super().__init__(*args, **kwargs)
+        self._unknown_cache = (0.0, b'')  # (monotonic expiry, payload)
     
-    def do_GET(self):
+    async def health(self, request):
         """Handle GET requests for health checks"""
-        if self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            
-            health_data = {
-                "status": "healthy",
-                "model_name": self.trainer.model_name if self.trainer else "unknown",
-                "epochs_completed": len(self.trainer.metrics) if self.trainer and hasattr(self.trainer, 'metrics') else 0,
-                "total_epochs": self.trainer.epochs if self.trainer else 0,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            self.wfile.write(json.dumps(health_data).encode())
+        if self.trainer:
+            body = self.trainer._health_blob
         else:
-            self.send_response(404)
-            self.end_headers()
+            expiry, body = self._unknown_cache
+            now = _monotonic()
+            if now >= expiry:
+                body = _dumps({**_UNKNOWN_HEALTH, "timestamp": _time()})
+                self._unknown_cache = (now + _UNKNOWN_HEALTH_TTL, body)
+        
+        # Payloads are pre-serialized bytes: the trainer's is rebuilt per epoch,
+        # the fallback at most once per TTL
+        return web.Response(body=body, content_type='application/json')
     
-    def log_message(self, format, *args):
-        """Suppress default logging"""
-        pass
+    def build_app(self) -> web.Application:
+        """Build the application; unknown paths fall through to aiohttp's 404"""
+        app = web.Application()
+        app.router.add_get('/health', self.health)
+        return app
 
 class HealthCheckServer:
     """HTTP health check server for the ML training application"""
@@ -63,13 +229,21 @@ class HealthCheckServer:
         self.port = port
         self.server = None
         self.thread = None
+        self.loop = None
     
     def start(self):
-        """Start the health check server in a separate thread"""
+        """Start the health check server on an event loop in a separate thread"""
         try:
-            handler = lambda *args, **kwargs: HealthCheckHandler(self.trainer, *args, **kwargs)
-            self.server = HTTPServer(('0.0.0.0', self.port), handler)
-            self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+            # uvloop only for this server's loop, leaving the global policy alone
+            self.loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+            self.server = web.AppRunner(HealthCheckHandler(self.trainer).build_app(), access_log=None)
+            self.loop.run_until_complete(self.server.setup())
+            
+            site = web.TCPSite(self.server, '0.0.0.0', self.port)
+            self.loop.run_until_complete(site.start())
+            self.port = self.server.addresses[0][1]  # Resolve port 0 to the bound port
+            
+            self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
             self.thread.start()
             logger.info(f"Health check server started on port {self.port}")
         except Exception as e:
@@ -79,8 +253,13 @@ class HealthCheckServer:
         """Stop the health check server"""
         if self.server:
             try:
-                self.server.shutdown()
-                self.server.server_close()
+                if self.thread and self.thread.is_alive():
+                    asyncio.run_coroutine_threadsafe(self.server.cleanup(), self.loop).result(timeout=5)
+                    self.loop.call_soon_threadsafe(self.loop.stop)
+                    self.thread.join(timeout=5)
+                else:
+                    self.loop.run_until_complete(self.server.cleanup())
+                self.loop.close()
                 logger.info("Health check server stopped")
             except Exception as e:
                 logger.error(f"Error stopping health check server: {e}")
@@ -91,8 +270,30 @@ class MLTrainer:
     def __init__(self, model_name: str = "demo-model", epochs: int = 10):
         self.model_name = model_name
         self.epochs = epochs
-        self.metrics = []
+        self.metrics = np.zeros(epochs, dtype=METRIC_DTYPE)
+        self.epochs_completed = 0
+        self.metrics_path = os.getenv('METRICS_PATH', '/tmp/training_metrics.jsonl')
+        self._metrics_fp = None
+        self._generated_metrics = None
+        
+        self.parallel_min_epochs = get_env_int('PARALLEL_METRICS_MIN_EPOCHS', 1024, 0)
+        
+        # Learning rate decay schedule is fixed for the run, so compute it once
+        self._lr_schedule = 0.001 * np.power(0.9, np.arange(1, epochs + 1) // 3)
+        
+        # One seeded generator drives all simulated randomness, so a run can be
+        # reproduced by setting TRAINING_SEED
+        self.seed = get_env_int('TRAINING_SEED', time.time_ns() & 0xFFFFFFFF, 0)
+        self._rng = np.random.default_rng(self.seed)
+        self._stop = threading.Event()
+        # Simulated epoch time scale for this run (see SLEEP_SCALE)
+        self.sleep_scale = SLEEP_SCALE if get_env_int('SIMULATE_EPOCH_SLEEP', 1, 0, 1) else 0.0
+        
+        # Running aggregates, so results never rescan the per-epoch metrics
+        self.best_accuracy = 0.0
+        self.last_metrics: Optional[Dict] = None
         self.start_time = datetime.now()
+        self._start_monotonic = _monotonic()  # Durations are immune to wall-clock jumps
         
         # Model version for tracking
         self.model_version = os.getenv('MODEL_VERSION', '1.0.0')
@@ -108,32 +309,143 @@ class MLTrainer:
         self.training_start_time_gauge = Gauge('ml_training_start_timestamp', 'Training start timestamp', ['model_name', 'model_version'], registry=self.registry)
         self.training_end_time_gauge = Gauge('ml_training_end_timestamp', 'Training end timestamp', ['model_name', 'model_version'], registry=self.registry)
         
+        # Labelled children resolved once, so updates skip the label lookup
+        labels = {'model_name': model_name, 'model_version': self.model_version}
+        self._accuracy_child = self.accuracy_gauge.labels(**labels)
+        self._loss_child = self.loss_gauge.labels(**labels)
+        self._epoch_child = self.epoch_counter.labels(**labels)
+        self._cpu_child = self.cpu_gauge.labels(**labels)
+        self._memory_child = self.memory_gauge.labels(**labels)
+        self._failure_child = self.metrics_failure_counter.labels(**labels)
+        self._start_time_child = self.training_start_time_gauge.labels(**labels)
+        self._end_time_child = self.training_end_time_gauge.labels(**labels)
+        
         self.pushgateway_url = os.getenv('PUSHGATEWAY_URL', 'http://pushgateway:9091')
+        self._session = requests.Session()  # Keep-alive connections reused across pushes
+        self.push_gzip = bool(get_env_int('PUSHGATEWAY_GZIP', 1, 0, 1))  # Needs Pushgateway 1.4+
         
-    def generate_training_metrics(self, epoch: int) -> Dict:
-        """Generate realistic training metrics for the current epoch"""
-        # Simulate improving accuracy with some randomness
-        base_accuracy = 0.6 + (epoch / self.epochs) * 0.3
-        accuracy = min(0.95, base_accuracy + random.uniform(-0.05, 0.05))
+        # Push timeout and retry policy are fixed for the run, so resolve them once
+        self.push_timeout = get_env_int('PUSHGATEWAY_TIMEOUT', 10, 1, 60)  # 10s default, 1-60s range
+        self.push_max_retries = get_env_int('PUSHGATEWAY_MAX_RETRIES', 3, 1, 10)
+        self.push_base_delay = get_env_int('PUSHGATEWAY_RETRY_BASE_DELAY', 1, 0, 60)  # seconds
+        self.push_max_delay = get_env_int('PUSHGATEWAY_RETRY_MAX_DELAY', 30, 0, 300)  # seconds
+        self.push_jitter = get_env_int('PUSHGATEWAY_RETRY_JITTER_PERCENT', 50, 0, 100) / 100
         
-        # Simulate decreasing loss
-        base_loss = 1.0 - (epoch / self.epochs) * 0.7
-        loss = max(0.1, base_loss + random.uniform(-0.1, 0.1))
+        # Batched Pushgateway flushing: epochs accumulate here and are pushed
+        # every push_interval epochs or flush_interval seconds, whichever comes
+        # first, plus a final flush at end of run
+        self.push_interval = get_env_int('PUSH_INTERVAL_EPOCHS', 5, 1, 1000)
+        self.flush_interval = get_env_int('PUSHGATEWAY_FLUSH_INTERVAL', 10, 0, 3600)
+        self._pending_metrics: List[Dict] = []
+        self._last_flush = time.monotonic()
+        atexit.register(self._flush_metrics)
         
-        # Simulate resource usage
-        cpu_usage = random.uniform(60, 90)
-        memory_usage = random.uniform(70, 85)
-        gpu_usage = random.uniform(80, 95) if random.random() > 0.3 else 0
+        # Pushes are handed to a background thread while training runs, so
+        # Pushgateway latency and retries never stall an epoch
+        self._push_queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=100)
+        self._pusher_thread: Optional[threading.Thread] = None
+        self.pusher_shutdown_timeout = get_env_int('PUSHER_SHUTDOWN_TIMEOUT', 30, 0, 600)
         
+        # Fields of the /health payload that never change during the run;
+        # the dynamic ones are placeholders that keep the key order stable
+        self._health_static = {
+            "status": "healthy",
+            "model_name": self.model_name,
+            "epochs_completed": 0,
+            "total_epochs": self.epochs,
+            "timestamp": 0.0
+        }
+        self._update_health_blob()
+        
+    def _update_health_blob(self):
+        """Re-serialize the /health payload after a state change"""
+        health = self._health_static.copy()
+        health["epochs_completed"] = self.epochs_completed
+        health["timestamp"] = _time()  # Epoch seconds; cheaper than building an ISO string
+        self._health_blob = _dumps(health)
+    
+    def stop(self):
+        """Cancel the training run at the next epoch boundary"""
+        self._stop.set()
+    
+    def close(self):
+        """Push pending metrics, then release the Pushgateway session and the metrics file"""
+        atexit.unregister(self._flush_metrics)
+        try:
+            self._flush_metrics()
+        except Exception as e:
+            logger.error(f"Failed to flush pending metrics: {e}")
+        self._stop_pusher()
+        self._close_metrics_stream()
+        self._session.close()
+    
+    def _start_pusher(self):
+        """Start the background thread that performs Pushgateway pushes"""
+        if self._pusher_thread is None:
+            self._pusher_thread = threading.Thread(target=self._pusher_loop, name='pushgateway-pusher', daemon=True)
+            self._pusher_thread.start()
+    
+    def _stop_pusher(self):
+        """Let queued pushes drain, then stop the pusher thread"""
+        thread = self._pusher_thread
+        if thread is None:
+            return
+        self._pusher_thread = None
+        try:
+            self._push_queue.put(None, timeout=self.pusher_shutdown_timeout)
+        except queue.Full:
+            logger.warning("Push queue still full at shutdown, pusher thread left running")
+            return
+        thread.join(self.pusher_shutdown_timeout)
+        if thread.is_alive():
+            logger.warning(f"Pusher thread did not finish within {self.pusher_shutdown_timeout}s")
+    
+    def _pusher_loop(self):
+        """Consume queued pushes until the shutdown sentinel arrives"""
+        while True:
+            item = self._push_queue.get()
+            if item is None:
+                return
+            count, snapshot = item
+            if self._do_push(snapshot):
+                logger.debug("Pushed %d epoch(s) of metrics to Prometheus Pushgateway: %s", count, self.pushgateway_url)
+    
+    def _pregenerate_metrics(self):
+        """Draw the simulated metrics for every epoch in one compiled batch"""
+        rands = self._rng.random((self.epochs, 6))
+        
+        # Threads only pay off once there are enough epochs to split up
+        if 0 < self.parallel_min_epochs <= self.epochs:
+            table = _compute_metrics_parallel(self.epochs, rands)
+        else:
+            table = _compute_metrics(self.epochs, rands)
+        
+        # Simulated epoch durations and validation noise are drawn in bulk too,
+        # rather than with one generator call per epoch
+        self._epoch_durations = self._rng.uniform(1.0, 3.0, self.epochs).tolist()
+        self._validation_factors = self._rng.uniform(0.95, 1.05, self.epochs).tolist()
+        
+        # Stored as plain lists so per-epoch lookups yield Python floats
+        generated = dict(zip(METRIC_FIELDS, table.T.tolist()))
+        generated["learning_rate"] = self._lr_schedule.tolist()
+        self._generated_metrics = generated
+    
+    def generate_training_metrics(self, epoch: int) -> Dict:
+        """Generate realistic training metrics for the current epoch"""
+        if self._generated_metrics is None:
+            self._pregenerate_metrics()
+        
+        i = epoch - 1
+        generated = self._generated_metrics
         return {
             "epoch": epoch,
-            "accuracy": round(accuracy, 4),
-            "loss": round(loss, 4),
-            "learning_rate": 0.001 * (0.9 ** (epoch // 3)),  # Learning rate decay
-            "cpu_usage_percent": round(cpu_usage, 2),
-            "memory_usage_percent": round(memory_usage, 2),
-            "gpu_usage_percent": round(gpu_usage, 2),
-            "timestamp": datetime.now().isoformat(),
+            "accuracy": generated["accuracy"][i],
+            "loss": generated["loss"][i],
+            "learning_rate": generated["learning_rate"][i],
+            "cpu_usage_percent": generated["cpu_usage_percent"][i],
+            "memory_usage_percent": generated["memory_usage_percent"][i],
+            "gpu_usage_percent": generated["gpu_usage_percent"][i],
+            "timestamp_ns": _time_ns(),
             "batch_size": 32,
             "model_name": self.model_name
         }
@@ -141,13 +453,33 @@ class MLTrainer:
     def train_epoch(self, epoch: int) -> Dict:
         """Simulate training for one epoch"""
         logger.info(f"Starting epoch {epoch}/{self.epochs}")
+        if self._generated_metrics is None:
+            self._pregenerate_metrics()
         
         # Simulate training time (1-3 seconds per epoch)
-        training_time = random.uniform(1.0, 3.0)
-        time.sleep(training_time)
+        # and wake early if the run is cancelled
+        training_time = self._epoch_durations[epoch - 1] * self.sleep_scale
+        if self._stop.wait(training_time):
+            raise KeyboardInterrupt
         
         metrics = self.generate_training_metrics(epoch)
-        self.metrics.append(metrics)
+        self.metrics[epoch - 1] = (
+            epoch,
+            metrics['accuracy'],
+            metrics['loss'],
+            metrics['learning_rate'],
+            metrics['cpu_usage_percent'],
+            metrics['memory_usage_percent'],
+            metrics['gpu_usage_percent'],
+            metrics['batch_size'],
+            metrics['timestamp_ns'],
+        )
+        self.epochs_completed = epoch
+        self._stream_metrics(metrics)
+        self._update_health_blob()
+        if metrics['accuracy'] > self.best_accuracy:
+            self.best_accuracy = metrics['accuracy']
+        self.last_metrics = metrics
         
         # Push metrics to Prometheus Pushgateway
         self.push_metrics_to_prometheus(metrics)
@@ -156,87 +488,180 @@ class MLTrainer:
         return metrics
     
     def push_metrics_to_prometheus(self, metrics: Dict):
-        """Push training metrics to Prometheus Pushgateway with retry logic and exponential backoff"""
-        max_retries = 3
-        base_delay = 1  # seconds
-        timeout = get_env_int('PUSHGATEWAY_TIMEOUT', 10, 1, 60)  # 10s default, 1-60s range
+        """Queue epoch metrics for the Pushgateway, flushing every push interval or flush interval"""
+        self._pending_metrics.append(metrics)
+        
+        epoch = metrics['epoch']
+        if (epoch % self.push_interval == 0 or epoch == self.epochs
+                or _monotonic() - self._last_flush > self.flush_interval):
+            self._flush_metrics()
+    
+    def _flush_metrics(self):
+        """Update the registry from pending metrics and push it to the Pushgateway"""
+        if not self._pending_metrics:
+            return
+        
+        # A cleared registry (main() empties it at shutdown) would go out as an
+        # empty PUT, which deletes the job's metrics from the Pushgateway
+        if not self.registry._names_to_collectors:
+            logger.warning(f"Metrics registry already cleared, dropping {len(self._pending_metrics)} pending epoch(s)")
+            self._pending_metrics = []
+            return
         
+        pending = self._pending_metrics
+        self._pending_metrics = []
+        self._last_flush = _monotonic()
+        
+        # Gauges reflect the latest epoch; the counter advances by the whole batch
+        metrics = pending[-1]
+        self._accuracy_child.set(metrics['accuracy'])
+        self._loss_child.set(metrics['loss'])
+        self._epoch_child.inc(len(pending))
+        self._cpu_child.set(metrics['cpu_usage_percent'])
+        self._memory_child.set(metrics['memory_usage_percent'])
+        
+        if self._pusher_thread is not None:
+            # The pusher serializes a frozen copy, so values in one push are
+            # consistent even while training keeps updating the live registry
+            snapshot = CollectorRegistry(auto_describe=False)
+            snapshot.register(RegistrySnapshot(self.registry))
+            try:
+                self._push_queue.put_nowait((len(pending), snapshot))
+            except queue.Full:
+                # The registry is cumulative, so the next push carries these values
+                logger.warning(f"Push queue full, dropping push of {len(pending)} epoch(s)")
+        elif self._do_push():
+            logger.debug("Pushed %d epoch(s) of metrics to Prometheus Pushgateway: %s", len(pending), self.pushgateway_url)
+    
+    def _keepalive_handler(self, url, method, timeout, headers, data):
+        """Pushgateway handler that sends pushes over the trainer's pooled session"""
+        headers = dict(headers)
+        if self.push_gzip:
+            data = gzip.compress(data)
+            headers['Content-Encoding'] = 'gzip'
+        
+        def handle():
+            response = self._session.request(method, url, data=data, headers=headers, timeout=timeout)
+            response.raise_for_status()
+        return handle
+    
+    def _do_push(self, registry: Optional[CollectorRegistry] = None) -> bool:
+        """Push a registry (the live one by default) to Prometheus Pushgateway with retry logic and exponential backoff"""
+        if registry is None:
+            registry = self.registry
+        max_retries = self.push_max_retries
+        base_delay = self.push_base_delay
+        max_delay = self.push_max_delay
+        jitter = self.push_jitter
+        timeout = self.push_timeout
+        
+        # Failures log with lazy %-style arguments, so messages are only
+        # formatted when the record is actually emitted
         for attempt in range(max_retries):
             try:
-                # Update Prometheus metrics with model version labels
-                labels = {'model_name': self.model_name, 'model_version': self.model_version}
-                
-                self.accuracy_gauge.labels(**labels).set(metrics['accuracy'])
-                self.loss_gauge.labels(**labels).set(metrics['loss'])
-                self.epoch_counter.labels(**labels).inc()
-                self.cpu_gauge.labels(**labels).set(metrics['cpu_usage_percent'])
-                self.memory_gauge.labels(**labels).set(metrics['memory_usage_percent'])
-                
                 # Push to gateway with timeout
                 push_to_gateway(
                     self.pushgateway_url, 
                     job=f'ml-training-{self.model_name}', 
-                    registry=self.registry,
-                    timeout=timeout
+                    registry=registry,
+                    timeout=timeout,
+                    handler=self._keepalive_handler
                 )
                 
-                logger.debug(f"Pushed metrics to Prometheus Pushgateway: {self.pushgateway_url}")
-                return  # Success, exit the retry loop
+                return True  # Success, exit the retry loop
                 
             except Timeout as e:
-                error_details = {
-                    'exception_type': type(e).__name__,
-                    'message': str(e),
-                    'attempt': attempt + 1,
-                    'max_retries': max_retries,
-                    'timeout': timeout
-                }
-                logger.warning(f"Timeout pushing metrics to Prometheus: {json.dumps(error_details)}")
+                logger.warning("Timeout pushing metrics to Prometheus: attempt=%d/%d timeout=%ds error=%s: %s",
+                               attempt + 1, max_retries, timeout, type(e).__name__, e)
                 
             except ConnectionError as e:
-                error_details = {
-                    'exception_type': type(e).__name__,
-                    'message': str(e),
-                    'attempt': attempt + 1,
-                    'max_retries': max_retries,
-                    'pushgateway_url': self.pushgateway_url
-                }
-                logger.warning(f"Connection error pushing metrics to Prometheus: {json.dumps(error_details)}")
+                logger.warning("Connection error pushing metrics to Prometheus: attempt=%d/%d url=%s error=%s: %s",
+                               attempt + 1, max_retries, self.pushgateway_url, type(e).__name__, e)
+                
+            except ValueError as e:
+                # Malformed URL or request (e.g. MissingSchema, InvalidURL); retrying cannot help
+                logger.error("Invalid Pushgateway request, not retrying: url=%s error=%s: %s",
+                             self.pushgateway_url, type(e).__name__, e)
+                self._failure_child.inc()
+                return False
                 
             except RequestException as e:
-                error_details = {
-                    'exception_type': type(e).__name__,
-                    'message': str(e),
-                    'attempt': attempt + 1,
-                    'max_retries': max_retries
-                }
-                logger.warning(f"Request error pushing metrics to Prometheus: {json.dumps(error_details)}")
+                status_code = getattr(e.response, 'status_code', None)
+                if status_code is not None and 400 <= status_code < 500 and status_code not in _RETRIABLE_CLIENT_STATUS:
+                    logger.error("Pushgateway rejected metrics, not retrying: status=%s error=%s: %s",
+                                 status_code, type(e).__name__, e)
+                    self._failure_child.inc()
+                    return False
+                logger.warning("Request error pushing metrics to Prometheus: attempt=%d/%d status=%s error=%s: %s",
+                               attempt + 1, max_retries, status_code, type(e).__name__, e)
                 
             except Exception as e:
-                error_details = {
-                    'exception_type': type(e).__name__,
-                    'message': str(e),
-                    'attempt': attempt + 1,
-                    'max_retries': max_retries
-                }
-                logger.error(f"Unexpected error pushing metrics to Prometheus: {json.dumps(error_details)}")
+                logger.error("Unexpected error pushing metrics to Prometheus: attempt=%d/%d error=%s: %s",
+                             attempt + 1, max_retries, type(e).__name__, e)
             
             # Increment failure counter
-            self.metrics_failure_counter.labels(model_name=self.model_name, model_version=self.model_version).inc()
+            self._failure_child.inc()
             
-            # If not the last attempt, wait with exponential backoff
+            # If not the last attempt, wait with capped exponential backoff plus jitter
             if attempt < max_retries - 1:
-                delay = base_delay * (2 ** attempt)  # Exponential backoff: 1s, 2s, 4s
-                logger.info(f"Retrying in {delay} seconds...")
-                time.sleep(delay)
+                delay = min(base_delay * (2 ** attempt), max_delay) * (1 + random.uniform(0, jitter))
+                logger.info("Retrying in %.2f seconds...", delay)
+                _time_sleep(delay)
         
-        logger.error(f"Failed to push metrics to Prometheus after {max_retries} attempts")
+        logger.error("Failed to push metrics to Prometheus after %d attempts", max_retries)
+        return False
+    
+    def _serialize_record(self, metrics: Dict) -> Dict:
+        """Convert one epoch's metrics into the on-disk record format"""
+        record = {name: metrics[name] for name in METRIC_DTYPE.names if name != 'timestamp_ns'}
+        # Timestamps are only formatted here, off the metric generation path
+        seconds, nanos = divmod(metrics['timestamp_ns'], 1_000_000_000)
+        record['timestamp'] = datetime.fromtimestamp(seconds).replace(microsecond=nanos // 1000).isoformat()
+        record['model_name'] = self.model_name
+        return record
+    
+    def metrics_as_list(self) -> List[Dict]:
+        """Materialize the completed epochs as a list of metric dicts"""
+        names = METRIC_DTYPE.names
+        return [
+            self._serialize_record(dict(zip(names, row)))
+            for row in self.metrics[:self.epochs_completed].tolist()
+        ]
+    
+    def _stream_metrics(self, metrics: Dict):
+        """Append one epoch's record to the NDJSON metrics file"""
+        if self._metrics_fp is None:
+            # Truncate on this trainer's first write, so the file never mixes in a previous run
+            self._metrics_fp = open(self.metrics_path, 'wb', buffering=1 << 16)
+        self._metrics_fp.write(_dumps_line(self._serialize_record(metrics)))
     
-    def save_metrics(self, filepath: str = "/tmp/training_metrics.json"):
-        """Save training metrics to a file"""
+    def _close_metrics_stream(self):
+        """Flush and close the NDJSON metrics file"""
+        if self._metrics_fp is not None:
+            try:
+                self._metrics_fp.close()
+                logger.info(f"Metrics saved to {self.metrics_path}")
+            except Exception as e:
+                logger.error(f"Failed to save metrics: {e}")
+            self._metrics_fp = None
+    
+    def save_metrics(self, filepath: Optional[str] = None):
+        """Save all completed epochs to a file as NDJSON, reusing the per-epoch stream when possible"""
+        # Every completed epoch is already streamed to metrics_path, so saving
+        # there only needs a flush rather than re-serializing the run
+        if filepath is None or os.path.abspath(filepath) == os.path.abspath(self.metrics_path):
+            try:
+                if self._metrics_fp is not None:
+                    self._metrics_fp.flush()
+                logger.info(f"Metrics saved to {self.metrics_path}")
+            except Exception as e:
+                logger.error(f"Failed to save metrics: {e}")
+            return
+        
         try:
-            with open(filepath, 'w') as f:
-                json.dump(self.metrics, f, indent=2)
+            payload = b''.join(_dumps_line(record) for record in self.metrics_as_list())
+            with open(filepath, 'wb', buffering=1 << 20) as f:
+                f.write(payload)
             logger.info(f"Metrics saved to {filepath}")
         except Exception as e:
             logger.error(f"Failed to save metrics: {e}")
@@ -244,28 +669,28 @@ class MLTrainer:
     def run_training(self) -> Dict:
         """Run the complete training process"""
         logger.info(f"Starting ML training for model: {self.model_name}")
-        logger.info(f"Training configuration: {self.epochs} epochs")
+        logger.info(f"Training configuration: {self.epochs} epochs, seed {self.seed}")
         
         # Set training start timestamp
-        start_timestamp = time.time()
-        self.training_start_time_gauge.labels(
-            model_name=self.model_name, 
-            model_version=self.model_version
-        ).set(start_timestamp)
+        start_timestamp = _time()
+        self._start_time_child.set(start_timestamp)
         
+        self._start_pusher()
         try:
+            self._pregenerate_metrics()
+            
             # Training loop
             for epoch in range(1, self.epochs + 1):
                 metrics = self.train_epoch(epoch)
                 
                 # Simulate validation every 3 epochs
                 if epoch % 3 == 0:
-                    val_accuracy = metrics['accuracy'] * random.uniform(0.95, 1.05)
+                    val_accuracy = metrics['accuracy'] * self._validation_factors[epoch - 1]
                     logger.info(f"Validation accuracy: {val_accuracy:.4f}")
             
             # Calculate final results
-            final_accuracy = self.metrics[-1]['accuracy']
-            total_time = (datetime.now() - self.start_time).total_seconds()
+            final_accuracy = self.last_metrics['accuracy']
+            total_time = _monotonic() - self._start_monotonic
             
             results = {
                 "model_name": self.model_name,
@@ -273,8 +698,8 @@ class MLTrainer:
                 "total_epochs": self.epochs,
                 "training_time_seconds": round(total_time, 2),
                 "status": "completed",
-                "best_accuracy": max([m['accuracy'] for m in self.metrics]),
-                "final_loss": self.metrics[-1]['loss']
+                "best_accuracy": self.best_accuracy,
+                "final_loss": self.last_metrics['loss']
             }
             
             logger.info(f"Training completed successfully!")
@@ -282,14 +707,8 @@ class MLTrainer:
             logger.info(f"Total training time: {total_time:.2f} seconds")
             
             # Set training end timestamp
-            end_timestamp = time.time()
-            self.training_end_time_gauge.labels(
-                model_name=self.model_name, 
-                model_version=self.model_version
-            ).set(end_timestamp)
-            
-            # Save metrics
-            self.save_metrics()
+            end_timestamp = _time()
+            self._end_time_child.set(end_timestamp)
             
             return results
             
@@ -299,16 +718,43 @@ class MLTrainer:
                 "model_name": self.model_name,
                 "status": "failed",
                 "error": str(e),
-                "epochs_completed": len(self.metrics)
+                "epochs_completed": self.epochs_completed
             }
+        
+        finally:
+            # Push whatever the last flush interval left pending, including
+            # epochs completed before a failure or cancellation
+            try:
+                self._flush_metrics()
+            except Exception as e:
+                logger.error(f"Failed to flush pending metrics: {e}")
+            # Wait for queued pushes so the final metrics reach the Pushgateway
+            self._stop_pusher()
+            # Metrics were streamed per epoch, so a failed run keeps what it completed
+            self._close_metrics_stream()
+
+# Parsed integer environment variables; None marks unset or invalid values
+_ENV_INT_CACHE: Dict[str, Optional[int]] = {}
+
+def _env_cache_clear():
+    """Forget cached environment lookups (e.g. after os.environ is patched)"""
+    _ENV_INT_CACHE.clear()
 
 def get_env_int(env_var: str, default: int, min_val: int = None, max_val: int = None) -> int:
     """Get integer from environment variable with optional min/max validation"""
-    try:
-        value = int(os.getenv(env_var, str(default)))
-    except ValueError:
-        logger.warning(f"Invalid value for {env_var}, using default: {default}")
-        value = default
+    if env_var in _ENV_INT_CACHE:
+        parsed = _ENV_INT_CACHE[env_var]
+    else:
+        raw = os.environ.get(env_var)
+        parsed = None
+        if raw is not None:
+            try:
+                parsed = int(raw)
+            except ValueError:
+                logger.warning(f"Invalid value for {env_var}, using default: {default}")
+        _ENV_INT_CACHE[env_var] = parsed
+    
+    value = default if parsed is None else parsed
     
     if min_val is not None and value < min_val:
         logger.warning(f"{env_var} value {value} is below minimum {min_val}, using minimum")
@@ -322,20 +768,21 @@ def get_env_int(env_var: str, default: int, min_val: int = None, max_val: int =
 
 def validate_model_name(model_name: str) -> str:
     """Validate that model name contains only alphanumeric characters"""
+    if _MODEL_NAME_RE.fullmatch(model_name):
+        return model_name
+    
+    # Slow path: work out which rule failed for the error message
     if not model_name:
         raise ValueError("MODEL_NAME cannot be empty")
     
     # Check if model name contains only alphanumeric characters (and hyphens/underscores)
-    if not re.match(r'^[a-zA-Z0-9_-]+$', model_name):
+    if not _MODEL_NAME_CHARS_RE.fullmatch(model_name):
         raise ValueError("MODEL_NAME must contain only alphanumeric characters, hyphens, and underscores")
     
     if len(model_name) < 3:
         raise ValueError("MODEL_NAME must be at least 3 characters long")
     
-    if len(model_name) > 50:
-        raise ValueError("MODEL_NAME must be no more than 50 characters long")
-    
-    return model_name
+    raise ValueError("MODEL_NAME must be no more than 50 characters long")
 
 def validate_training_epochs(epochs_str: str) -> int:
     """Validate that training epochs is within the acceptable range (1-1000)"""
@@ -355,8 +802,14 @@ def validate_training_epochs(epochs_str: str) -> int:
 def main():
     """Main function to run the ML training simulation"""
     health_server = None
+    previous_sigterm = None
     
     try:
+        # Warmup mode only compiles the kernels (e.g. during image build)
+        if os.getenv('WARMUP_MODE') == '1' or '--warmup' in sys.argv[1:]:
+            warmup()
+            return 0
+        
         # Get and validate configuration from environment variables
         model_name_raw = os.getenv('MODEL_NAME', 'demo-model')
         epochs_raw = os.getenv('TRAINING_EPOCHS', '10')
@@ -375,6 +828,9 @@ def main():
         health_server = HealthCheckServer(trainer, port=health_port)
         health_server.start()
         
+        # Let SIGTERM (e.g. container shutdown) cancel the run immediately
+        previous_sigterm = signal.signal(signal.SIGTERM, lambda signum, frame: trainer.stop())
+        
         # Run training
         results = trainer.run_training()
         
@@ -415,6 +871,16 @@ def main():
         return 1
         
     finally:
+        if previous_sigterm is not None:
+            signal.signal(signal.SIGTERM, previous_sigterm)
+        
+        # Release trainer connections and files
+        try:
+            if 'trainer' in locals():
+                trainer.close()
+        except Exception as e:
+            logger.error(f"Error closing trainer: {e}")
+        
         # Cleanup metrics registry
         try:
             if 'trainer' in locals() and hasattr(trainer, 'registry'):
@@ -7,75 +7,105 @@ This script validates all the fixes applied to the configuration.
 import os
 import json
 import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
-def check_docker_socket_mount():
+# Log rotation settings, counted together in a single scan of docker-compose.yml
+_LOG_ROTATION_RE = re.compile(r'logging:|max-size: "10m"|max-file: "3"')
+
+# Mutually exclusive alternatives, each answered by one scan of the file
+_NETWORK_MODE_RE = re.compile(r'network_mode = "(mlops-infra_mlops-network|bridge)"')
+_REQUESTS_VERSION_RE = re.compile(r'requests==(2\.32\.3|2\.31\.0)')
+_DASHBOARD_DATASOURCE_RE = re.compile(r'\$\{DS_PROMETHEUS\}|"uid": "Prometheus"')
+
+_DOCKER_SOCKET_MOUNT = '/var/run/docker.sock:/var/run/docker.sock'
+
+class FileContents(dict):
+    """Config file contents keyed by path, read from disk at most once"""
+    
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+    
+    def __missing__(self, path):
+        # Checks run concurrently; the lock stops two threads reading the same file
+        with self._lock:
+            if path in self:
+                return self[path]
+            with open(path, 'r') as f:
+                content = self[path] = f.read()
+        return content
+
+def check_docker_socket_mount(files):
     """Check if Docker socket mount is writable"""
-    with open('docker-compose.yml', 'r') as f:
-        content = f.read()
-    
-    # Should not have :ro on docker socket mount
-    if '/var/run/docker.sock:/var/run/docker.sock:ro' in content:
-        return False, "Docker socket mount is still read-only"
-    elif '/var/run/docker.sock:/var/run/docker.sock' in content:
-        return True, "Docker socket mount is writable"
-    else:
+    content = files['docker-compose.yml']
+    
+    # Should not have :ro on docker socket mount; each match is checked for
+    # the suffix in place, so the file is scanned once
+    start = content.find(_DOCKER_SOCKET_MOUNT)
+    if start == -1:
         return False, "Docker socket mount not found"
+    
+    while start != -1:
+        end = start + len(_DOCKER_SOCKET_MOUNT)
+        if content.startswith(':ro', end):
+            return False, "Docker socket mount is still read-only"
+        start = content.find(_DOCKER_SOCKET_MOUNT, end)
+    
+    return True, "Docker socket mount is writable"
 
-def check_nomad_job_mount():
+def check_nomad_job_mount(files):
     """Check if Nomad job file is mounted"""
-    with open('docker-compose.yml', 'r') as f:
-        content = f.read()
+    content = files['docker-compose.yml']
     
     if './nomad/mlops.nomad:/nomad/config/mlops.nomad:ro' in content:
         return True, "Nomad job file is mounted"
     else:
         return False, "Nomad job file mount is missing"
 
-def check_network_mode():
+def check_network_mode(files):
     """Check network mode in Nomad job file"""
-    with open('nomad/mlops.nomad', 'r') as f:
-        content = f.read()
+    modes = set(_NETWORK_MODE_RE.findall(files['nomad/mlops.nomad']))
     
-    if 'network_mode = "mlops-infra_mlops-network"' in content:
+    if 'mlops-infra_mlops-network' in modes:
         return True, "Network mode set to custom network"
-    elif 'network_mode = "bridge"' in content:
+    elif 'bridge' in modes:
         return False, "Network mode still set to bridge (won't communicate with custom network)"
     else:
         return False, "Network mode not found"
 
-def check_requests_version():
+def check_requests_version(files):
     """Check if requests package is updated"""
-    with open('app/requirements.txt', 'r') as f:
-        content = f.read()
+    versions = set(_REQUESTS_VERSION_RE.findall(files['app/requirements.txt']))
     
-    if 'requests==2.32.3' in content:
+    if '2.32.3' in versions:
         return True, "Requests package updated to secure version"
-    elif 'requests==2.31.0' in content:
+    elif '2.31.0' in versions:
         return False, "Requests package still has security vulnerability"
     else:
         return False, "Requests package not found"
 
-def check_grafana_dashboard():
+def check_grafana_dashboard(files):
     """Check if Grafana dashboard variables are fixed"""
-    with open('grafana/dashboard.json', 'r') as f:
-        content = f.read()
+    found = set(_DASHBOARD_DATASOURCE_RE.findall(files['grafana/dashboard.json']))
     
-    if '${DS_PROMETHEUS}' in content:
+    if '${DS_PROMETHEUS}' in found:
         return False, "Dashboard still has undefined variables"
-    elif '"uid": "Prometheus"' in content:
+    elif '"uid": "Prometheus"' in found:
         return True, "Dashboard variables fixed"
     else:
         return False, "Dashboard datasource configuration unclear"
 
-def check_log_rotation():
+def check_log_rotation(files):
     """Check if log rotation is configured for all services"""
-    with open('docker-compose.yml', 'r') as f:
-        content = f.read()
+    content = files['docker-compose.yml']
     
     # Count occurrences of logging configuration
-    log_configs = content.count('logging:')
-    max_size_configs = content.count('max-size: "10m"')
-    max_file_configs = content.count('max-file: "3"')
+    counts = Counter(_LOG_ROTATION_RE.findall(content))
+    log_configs = counts['logging:']
+    max_size_configs = counts['max-size: "10m"']
+    max_file_configs = counts['max-file: "3"']
     
     # Should have logging for consul, nomad, prometheus, grafana, pushgateway
     expected_services = 5
@@ -85,46 +115,51 @@ def check_log_rotation():
     else:
         return False, f"Log rotation incomplete: {log_configs}/{expected_services} services configured"
 
-def check_startup_delay():
+def check_startup_delay(files):
     """Check if Nomad has startup delay"""
-    with open('docker-compose.yml', 'r') as f:
-        content = f.read()
+    content = files['docker-compose.yml']
     
     if 'sleep 10 && nomad agent' in content:
         return True, "Nomad startup delay configured"
     else:
         return False, "Nomad startup delay missing"
 
-def check_pushgateway():
+def check_pushgateway(files):
     """Check if Pushgateway is configured"""
-    with open('docker-compose.yml', 'r') as f:
-        content = f.read()
+    content = files['docker-compose.yml']
     
     if 'pushgateway:' in content and 'prom/pushgateway' in content:
         return True, "Pushgateway service configured"
     else:
         return False, "Pushgateway service missing"
 
-def check_prometheus_metrics():
+def check_prometheus_metrics(files):
     """Check if ML training script has Prometheus integration"""
-    with open('app/train.py', 'r') as f:
-        content = f.read()
+    content = files['app/train.py']
     
     if 'prometheus_client' in content and 'push_to_gateway' in content:
         return True, "ML training script has Prometheus metrics"
     else:
         return False, "ML training script missing Prometheus integration"
 
-def check_prometheus_client_dependency():
+def check_prometheus_client_dependency(files):
     """Check if prometheus-client is in requirements"""
-    with open('app/requirements.txt', 'r') as f:
-        content = f.read()
+    content = files['app/requirements.txt']
     
     if 'prometheus-client' in content:
         return True, "Prometheus client dependency added"
     else:
         return False, "Prometheus client dependency missing"
 
+def run_check(fix_name, check_func, files):
+    """Run one check, turning its outcome into a (name, status, message) row"""
+    try:
+        success, message = check_func(files)
+        status = "✅ FIXED" if success else "❌ ISSUE"
+        return fix_name, status, message
+    except Exception as e:
+        return fix_name, "❌ ERROR", str(e)
+
 def main():
     """Main validation function"""
     print("🔍 MLOps Infrastructure - Fix Validation")
@@ -143,21 +178,14 @@ def main():
         ("Prometheus Client Dependency", check_prometheus_client_dependency),
     ]
     
-    all_fixed = True
-    results = []
-    
-    for fix_name, check_func in fixes:
-        try:
-            success, message = check_func()
-            status = "✅ FIXED" if success else "❌ ISSUE"
-            results.append((fix_name, status, message))
-            
-            if not success:
-                all_fixed = False
-                
-        except Exception as e:
-            results.append((fix_name, "❌ ERROR", str(e)))
-            all_fixed = False
+    # Several checks inspect the same files, so share one read of each
+    files = FileContents()
+    
+    # Checks are independent, so run them concurrently; map keeps results in order
+    with ThreadPoolExecutor(max_workers=len(fixes)) as executor:
+        results = list(executor.map(lambda fix: run_check(*fix, files), fixes))
+    
+    all_fixed = all(status == "✅ FIXED" for _, status, _ in results)
     
     # Print results
     print("\n📋 Fix Validation Results:")
@@ -4,40 +4,111 @@ MLOps Infrastructure Pre-Deployment Checker
 This script performs comprehensive checks before deployment.
 """
 
+import asyncio
+import functools
+import shutil
 import subprocess
 import sys
 import os
+import io
 import json
+import re
 import time
+import socket
+import threading
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
 
-def run_command(command, capture_output=True):
-    """Run a command and return the result"""
+class ThreadOutput(io.TextIOBase):
+    """stdout stand-in that routes each worker thread's prints to its own buffer"""
+    
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+    
+    def capture(self):
+        """Start buffering the calling thread's output"""
+        self._local.buffer = io.StringIO()
+    
+    def release(self):
+        """Stop buffering the calling thread's output and return it"""
+        buffer = self._local.buffer
+        self._local.buffer = None
+        return buffer.getvalue()
+    
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer or self._fallback).write(text)
+    
+    def flush(self):
+        self._fallback.flush()
+
+# Compose plugin line in `docker info` output, e.g. "  compose: Docker Compose (Docker Inc.)"
+_COMPOSE_PLUGIN_RE = re.compile(r'^\s*compose:\s*(.+?)\s*$', re.IGNORECASE | re.MULTILINE)
+
+_docker_info_lock = threading.Lock()
+_docker_info_result = None
+
+def run_command(argv, capture_output=True):
+    """Run a command (an argument list, no shell) and return the result"""
     try:
         if capture_output:
-            result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=30)
+            result = subprocess.run(argv, capture_output=True, text=True, timeout=30)
             return result.returncode == 0, result.stdout.strip(), result.stderr.strip()
         else:
-            result = subprocess.run(command, shell=True, timeout=30)
+            result = subprocess.run(argv, timeout=30)
             return result.returncode == 0, "", ""
     except subprocess.TimeoutExpired:
         return False, "", "Command timed out"
     except Exception as e:
         return False, "", str(e)
 
+async def run_command_async(argv, timeout=30):
+    """Run a command (an argument list, no shell) asynchronously and return the result"""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+    except OSError as e:
+        return False, "", str(e)
+    
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return False, "", "Command timed out"
+    
+    return process.returncode == 0, stdout.decode().strip(), stderr.decode().strip()
+
+def run_commands(*commands):
+    """Run independent commands concurrently, returning their results in argument order"""
+    async def gather():
+        return await asyncio.gather(*(run_command_async(command) for command in commands))
+    return asyncio.run(gather())
+
+def docker_info():
+    """Run `docker info` once and share the result between the checks that need it"""
+    global _docker_info_result
+    with _docker_info_lock:
+        if _docker_info_result is None:
+            _docker_info_result = run_command(["docker", "info"])
+    return _docker_info_result
+
 def check_docker_installation():
     """Check if Docker is installed and running"""
     print("🐳 Checking Docker installation...")
     
     # Check if docker command exists
-    success, stdout, stderr = run_command("docker --version")
+    success, stdout, stderr = run_command(["docker", "--version"])
     if not success:
         return False, "Docker is not installed or not in PATH"
     
     print(f"   ✅ Docker found: {stdout}")
     
-    # Check if Docker daemon is running
-    success, stdout, stderr = run_command("docker info")
-    if not success:
+    # Check if Docker daemon is running; the output is reused by check_docker_compose
+    daemon_ok, _, _ = docker_info()
+    if not daemon_ok:
         return False, "Docker daemon is not running. Please start Docker Desktop."
     
     print("   ✅ Docker daemon is running")
@@ -47,20 +118,42 @@ def check_docker_compose():
     """Check Docker Compose availability"""
     print("📦 Checking Docker Compose...")
     
-    # Try docker-compose first
-    success, stdout, stderr = run_command("docker-compose --version")
+    # A running daemon lists the Compose plugin in `docker info`, which
+    # check_docker_installation has already fetched
+    info_ok, info, _ = docker_info()
+    plugin_line = _COMPOSE_PLUGIN_RE.search(info) if info_ok else None
+    if plugin_line:
+        print(f"   ✅ Docker Compose found: {plugin_line.group(1)}")
+        return True, "docker compose"
+    
+    # Otherwise probe both CLIs concurrently, preferring docker-compose
+    legacy, plugin = run_commands(["docker-compose", "--version"], ["docker", "compose", "version"])
+    
+    success, stdout, stderr = legacy
     if success:
         print(f"   ✅ Docker Compose found: {stdout}")
         return True, "docker-compose"
     
-    # Try docker compose (newer syntax)
-    success, stdout, stderr = run_command("docker compose version")
+    # Fall back to docker compose (newer syntax)
+    success, stdout, stderr = plugin
     if success:
         print(f"   ✅ Docker Compose found: {stdout}")
         return True, "docker compose"
     
     return False, "Docker Compose not found"
 
+def port_in_use(port):
+    """Return the bind error if the port is taken, or None if it is free"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        # Ignore TIME_WAIT leftovers; on Windows SO_REUSEADDR would allow stealing a live port
+        if os.name != 'nt':
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(("", port))
+        except OSError as e:
+            return str(e)
+    return None
+
 def check_ports():
     """Check if required ports are available"""
     print("🔌 Checking port availability...")
@@ -68,11 +161,11 @@ def check_ports():
     required_ports = [3000, 4646, 8500, 9090]
     
     for port in required_ports:
-        # Use netstat to check if port is in use
-        success, stdout, stderr = run_command(f"netstat -an | findstr :{port}")
-        if success and stdout:
+        # Probe by binding the port in-process rather than forking netstat per port
+        error = port_in_use(port)
+        if error:
             print(f"   ⚠️  Port {port} appears to be in use")
-            print(f"      {stdout}")
+            print(f"      {error}")
         else:
             print(f"   ✅ Port {port} is available")
     
@@ -82,10 +175,12 @@ def check_system_resources():
     """Check system resources"""
     print("💻 Checking system resources...")
     
-    # Check available disk space (Windows)
-    success, stdout, stderr = run_command("dir /-c")
-    if success:
-        print("   ✅ Disk space check completed")
+    # Check available disk space in-process (works on every platform, no shell)
+    try:
+        free_gb = shutil.disk_usage(".").free / (1024 ** 3)
+        print(f"   ✅ Disk space check completed ({free_gb:.1f} GB free)")
+    except OSError:
+        pass
     
     # Note: Memory check would require additional tools on Windows
     print("   ℹ️  Ensure at least 4GB RAM is available")
@@ -100,7 +195,7 @@ def validate_configuration():
         print("   ⚠️  Configuration validator not found")
         return True, "Skipping configuration validation"
     
-    success, stdout, stderr = run_command("python validate_simple.py")
+    success, stdout, stderr = run_command([sys.executable, "validate_simple.py"])
     if success:
         print("   ✅ All configurations are valid")
         return True, "Configuration validation passed"
@@ -109,6 +204,14 @@ def validate_configuration():
         print(stderr)
         return False, "Configuration validation failed"
 
+@functools.lru_cache(maxsize=None)
+def list_directory(dirname):
+    """Names in a directory, listed once per run (empty if it cannot be read)"""
+    try:
+        return frozenset(os.listdir(dirname))
+    except OSError:
+        return frozenset()
+
 def check_files():
     """Check if all required files exist"""
     print("📄 Checking required files...")
@@ -125,7 +228,9 @@ def check_files():
     
     missing_files = []
     for file in required_files:
-        if os.path.exists(file):
+        # Membership in the parent's cached listing instead of a stat call per file
+        dirname, name = os.path.split(file)
+        if name in list_directory(dirname or '.'):
             print(f"   ✅ {file}")
         else:
             print(f"   ❌ {file} - MISSING")
@@ -136,6 +241,16 @@ def check_files():
     
     return True, "All required files present"
 
+def run_check(check_name, check_func, output):
+    """Run one check with its progress output buffered; returns (name, status, message, output)"""
+    output.capture()
+    try:
+        success, message = check_func()
+        status = "✅ PASS" if success else "❌ FAIL"
+    except Exception as e:
+        status, message = "❌ ERROR", str(e)
+    return check_name, status, message, output.release()
+
 def main():
     """Main pre-deployment check function"""
     print("🚀 MLOps Infrastructure Pre-Deployment Checker")
@@ -150,21 +265,18 @@ def main():
         ("System Resources", check_system_resources),
     ]
     
-    all_passed = True
+    # Checks are independent and mostly wait on subprocesses, so run them
+    # concurrently; each one's progress output is buffered and replayed in order
+    output = ThreadOutput(sys.stdout)
+    with redirect_stdout(output), ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        outcomes = list(executor.map(lambda check: run_check(*check, output), checks))
+    
     results = []
+    for check_name, status, message, check_output in outcomes:
+        print(check_output, end="")
+        results.append((check_name, status, message))
     
-    for check_name, check_func in checks:
-        try:
-            success, message = check_func()
-            status = "✅ PASS" if success else "❌ FAIL"
-            results.append((check_name, status, message))
-            
-            if not success:
-                all_passed = False
-                
-        except Exception as e:
-            results.append((check_name, "❌ ERROR", str(e)))
-            all_passed = False
+    all_passed = all(status == "✅ PASS" for _, status, _ in results)
     
     # Print summary
     print(f"\n📋 Pre-Deployment Check Results:")
@@ -179,11 +291,8 @@ def main():
         print("🎉 ALL CHECKS PASSED - Ready for deployment!")
         print(f"\n🚀 Next steps:")
         
-        # Check which Docker Compose command to use
-        compose_cmd = "docker-compose"
-        success, stdout, stderr = run_command("docker-compose --version")
-        if not success:
-            compose_cmd = "docker compose"
+        # check_docker_compose already detected the command; its message is the CLI string
+        compose_cmd = next(message for check_name, _, message in results if check_name == "Docker Compose")
         
         print(f"   1. {compose_cmd} build ml-trainer")
         print(f"   2. {compose_cmd} up -d")
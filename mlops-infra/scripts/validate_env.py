@@ -7,7 +7,7 @@ Validates that all required environment variables are properly configured.
 import os
 import sys
 import re
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 # Required environment variables and their validation rules
 ENV_VARS = {
@@ -43,81 +43,172 @@ ENV_VARS = {
         'min_value': 1,
         'max_value': 60,
         'description': 'Pushgateway timeout in seconds'
+    },
+    'PUSHGATEWAY_MAX_RETRIES': {
+        'required': False,
+        'type': 'int',
+        'min_value': 1,
+        'max_value': 10,
+        'description': 'Pushgateway push attempts before giving up'
+    },
+    'PUSHGATEWAY_RETRY_BASE_DELAY': {
+        'required': False,
+        'type': 'int',
+        'min_value': 0,
+        'max_value': 60,
+        'description': 'Initial Pushgateway retry delay in seconds (doubles per attempt)'
+    },
+    'PUSHGATEWAY_RETRY_MAX_DELAY': {
+        'required': False,
+        'type': 'int',
+        'min_value': 0,
+        'max_value': 300,
+        'description': 'Upper bound on the Pushgateway retry delay in seconds'
+    },
+    'PUSHGATEWAY_RETRY_JITTER_PERCENT': {
+        'required': False,
+        'type': 'int',
+        'min_value': 0,
+        'max_value': 100,
+        'description': 'Random extra delay added to each retry, as a percentage of the delay'
+    },
+    'PUSHGATEWAY_GZIP': {
+        'required': False,
+        'type': 'int',
+        'min_value': 0,
+        'max_value': 1,
+        'description': 'Gzip-compress Pushgateway pushes (1, default) or send plain text (0)'
+    },
+    'PUSH_INTERVAL_EPOCHS': {
+        'required': False,
+        'type': 'int',
+        'min_value': 1,
+        'max_value': 1000,
+        'description': 'Push metrics to the Pushgateway every N epochs'
+    },
+    'PUSHGATEWAY_FLUSH_INTERVAL': {
+        'required': False,
+        'type': 'int',
+        'min_value': 0,
+        'max_value': 3600,
+        'description': 'Minimum seconds between batched Pushgateway pushes'
+    },
+    'PUSHER_SHUTDOWN_TIMEOUT': {
+        'required': False,
+        'type': 'int',
+        'min_value': 0,
+        'max_value': 600,
+        'description': 'Seconds to wait for queued Pushgateway pushes at end of training'
+    },
+    'TRAINING_SLEEP_SCALE': {
+        'required': False,
+        'pattern': r'^\d+(\.\d+)?$',
+        'description': 'Multiplier for the simulated 1-3s per-epoch training time (non-negative number, default 1.0; 0 skips it)'
+    },
+    'SIMULATE_EPOCH_SLEEP': {
+        'required': False,
+        'type': 'int',
+        'min_value': 0,
+        'max_value': 1,
+        'description': 'Set to 0 to skip the simulated 1-3s per-epoch training time (same as TRAINING_SLEEP_SCALE=0)'
+    },
+    'TRAINING_SEED': {
+        'required': False,
+        'type': 'int',
+        'min_value': 0,
+        'description': 'Seed for the simulated training randomness (random if not set)'
+    },
+    'PARALLEL_METRICS_MIN_EPOCHS': {
+        'required': False,
+        'type': 'int',
+        'min_value': 0,
+        'description': 'Epoch count at which metric generation runs multi-threaded (0 disables)'
     }
 }
 
-def validate_env_var(name: str, value: Optional[str], config: Dict) -> List[str]:
-    """Validate a single environment variable."""
-    errors = []
-    
-    # Check if required
-    if config.get('required', False) and not value:
-        errors.append(f"{name} is required but not set")
-        return errors
-    
-    # Skip validation if not set and not required
-    if not value:
-        return errors
-    
-    # Type validation
+def compile_validator(name: str, config: Dict) -> Callable[[Optional[str]], List[str]]:
+    """Specialize the validation rules of one variable into a closure."""
+    required = config.get('required', False)
     var_type = config.get('type', 'str')
-    if var_type == 'int':
-        try:
-            int_value = int(value)
+    min_value = config.get('min_value')
+    max_value = config.get('max_value')
+    min_length = config.get('min_length')
+    max_length = config.get('max_length')
+    # Compiled once here and closed over, rather than on each validation
+    pattern = re.compile(config['pattern']) if 'pattern' in config else None
+    
+    def validate(value: Optional[str]) -> List[str]:
+        # Check if required
+        if not value:
+            return [f"{name} is required but not set"] if required else []
+        
+        errors = []
+        
+        # Type validation
+        if var_type == 'int':
+            try:
+                int_value = int(value)
+            except ValueError:
+                return [f"{name} must be a valid integer"]
             
-            # Min value check
-            if 'min_value' in config and int_value < config['min_value']:
-                errors.append(f"{name} must be at least {config['min_value']}")
+            if min_value is not None and int_value < min_value:
+                errors.append(f"{name} must be at least {min_value}")
             
-            # Max value check
-            if 'max_value' in config and int_value > config['max_value']:
-                errors.append(f"{name} must be at most {config['max_value']}")
-        except ValueError:
-            errors.append(f"{name} must be a valid integer")
-            return errors
-    
-    # String validations
-    if var_type == 'str':
-        # Length validations
-        if 'min_length' in config and len(value) < config['min_length']:
-            errors.append(f"{name} must be at least {config['min_length']} characters long")
+            if max_value is not None and int_value > max_value:
+                errors.append(f"{name} must be at most {max_value}")
         
-        if 'max_length' in config and len(value) > config['max_length']:
-            errors.append(f"{name} must be at most {config['max_length']} characters long")
+        # String validations
+        elif var_type == 'str':
+            if min_length is not None and len(value) < min_length:
+                errors.append(f"{name} must be at least {min_length} characters long")
+            
+            if max_length is not None and len(value) > max_length:
+                errors.append(f"{name} must be at most {max_length} characters long")
+            
+            if pattern is not None and not pattern.match(value):
+                errors.append(f"{name} does not match required pattern: {pattern.pattern}")
         
-        # Pattern validation
-        if 'pattern' in config:
-            if not re.match(config['pattern'], value):
-                errors.append(f"{name} does not match required pattern: {config['pattern']}")
+        return errors
     
-    return errors
+    return validate
 
-def validate_environment() -> bool:
-    """Validate all environment variables."""
-    print("Validating environment variables...")
-    print("=" * 50)
+# One specialized validator per variable, built once at import
+COMPILED_VALIDATORS = {name: compile_validator(name, config) for name, config in ENV_VARS.items()}
+
+def validate_env_var(name: str, value: Optional[str], config: Dict) -> List[str]:
+    """Validate a single environment variable."""
+    validator = COMPILED_VALIDATORS.get(name)
+    if validator is None or config is not ENV_VARS.get(name):
+        # Ad-hoc configs are compiled (patterns included) for this call only
+        validator = compile_validator(name, config)
+    return validator(value)
+
+def validate_environment(env: Optional[Dict[str, str]] = None) -> bool:
+    """Validate all environment variables (from a snapshot of os.environ by default)."""
+    # Read the environment once; lookups below are plain dict hits
+    if env is None:
+        env = dict(os.environ)
     
-    all_errors = []
+    results = {var_name: validator(env.get(var_name)) for var_name, validator in COMPILED_VALIDATORS.items()}
+    all_errors = [error for errors in results.values() for error in errors]
     
-    for var_name, config in ENV_VARS.items():
-        value = os.getenv(var_name)
-        errors = validate_env_var(var_name, value, config)
-        
+    # Build the whole report and write it in one call instead of a print per variable
+    lines = ["Validating environment variables...", "=" * 50]
+    for var_name, errors in results.items():
         if errors:
-            print(f"❌ {var_name}: {', '.join(errors)}")
-            all_errors.extend(errors)
+            lines.append(f"❌ {var_name}: {', '.join(errors)}")
         else:
-            status = "✓ (set)" if value else "✓ (optional, not set)"
-            print(f"✅ {var_name}: {status}")
-    
-    print("=" * 50)
+            status = "✓ (set)" if env.get(var_name) else "✓ (optional, not set)"
+            lines.append(f"✅ {var_name}: {status}")
+    lines.append("=" * 50)
     
     if all_errors:
-        print(f"❌ Environment validation failed with {len(all_errors)} error(s)")
-        return False
+        lines.append(f"❌ Environment validation failed with {len(all_errors)} error(s)")
     else:
-        print("✅ All environment variables are valid")
-        return True
+        lines.append("✅ All environment variables are valid")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+    return not all_errors
 
 def print_env_documentation():
     """Print documentation for all environment variables."""
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the environment variable validator
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from validate_env import validate_env_var
+
+
+class TestValidateEnvVar:
+    """Test validating a single variable against an inline config."""
+    
+    def test_inline_pattern_matches(self):
+        """Test a value matching an inline pattern has no errors."""
+        assert validate_env_var('X', 'abc', {'pattern': r'^[a-z]+$'}) == []
+    
+    def test_inline_pattern_mismatch(self):
+        """Test a value not matching an inline pattern reports the pattern."""
+        errors = validate_env_var('X', 'ABC1', {'pattern': r'^[a-z]+$'})
+        
+        assert errors == ["X does not match required pattern: ^[a-z]+$"]
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the dependency-free configuration validator
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from validate_simple import validate_basic_yaml
+
+
+class TestValidateBasicYaml:
+    """Test the basic YAML indentation check."""
+    
+    def test_tab_indentation_rejected(self, tmp_path):
+        """Test a tab in a mapping's indentation fails with its line number."""
+        path = tmp_path / 'tabs.yml'
+        path.write_text("global:\n  scrape_interval: 15s\nscrape_configs:\n\t- job_name: prometheus\n")
+        
+        is_valid, message = validate_basic_yaml(str(path))
+        
+        assert not is_valid
+        assert message == "Tab used for indentation on line 4"
+    
+    def test_tabs_inside_block_scalar_allowed(self, tmp_path):
+        """Test tabs in literal and folded block scalar content are not treated as indentation."""
+        path = tmp_path / 'block.yml'
+        path.write_text(
+            "script: |\n"
+            "  for f in *; do\n"
+            "  \techo \"$f\"\n"
+            "  done\n"
+            "steps:\n"
+            "  - run: >-\n"
+            "      make\n"
+            "      \t--quiet\n"
+            "  - name: done\n"
+        )
+        
+        is_valid, message = validate_basic_yaml(str(path))
+        
+        assert is_valid, message
@@ -4,119 +4,162 @@ MLOps Infrastructure Configuration Validator
 This script validates all configuration files without requiring Docker.
 """
 
-import json
 import yaml
 import os
+import queue
 import sys
+import time
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-def validate_json_file(filepath):
-    """Validate JSON file syntax"""
-    try:
-        with open(filepath, 'r') as f:
-            json.load(f)
-        return True, "Valid JSON"
-    except json.JSONDecodeError as e:
-        return False, f"JSON Error: {e}"
-    except Exception as e:
-        return False, f"File Error: {e}"
+from _validators import validate_json_file, validate_hcl_file, validate_python_file, validate_dockerfile
+
+# LibYAML-backed loader when PyYAML was built with it (the PyPI wheels are),
+# otherwise the pure-Python one
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Optional file-system watcher for --watch mode
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
 
 def validate_yaml_file(filepath):
     """Validate YAML file syntax"""
     try:
         with open(filepath, 'r') as f:
-            yaml.safe_load(f)
+            yaml.load(f, Loader=_YamlLoader)
         return True, "Valid YAML"
     except yaml.YAMLError as e:
         return False, f"YAML Error: {e}"
     except Exception as e:
         return False, f"File Error: {e}"
 
-def validate_hcl_file(filepath):
-    """Basic HCL file validation (syntax check)"""
-    try:
-        with open(filepath, 'r') as f:
-            content = f.read()
-        
-        # Basic syntax checks
-        if content.count('{') != content.count('}'):
-            return False, "Unmatched braces in HCL file"
-        
-        if content.count('"') % 2 != 0:
-            return False, "Unmatched quotes in HCL file"
-            
-        return True, "Basic HCL syntax appears valid"
-    except Exception as e:
-        return False, f"File Error: {e}"
+# Define files to validate
+VALIDATIONS = [
+    # JSON files
+    ("grafana/dashboard.json", validate_json_file),
+    
+    # YAML files  
+    ("docker-compose.yml", validate_yaml_file),
+    ("prometheus/prometheus.yml", validate_yaml_file),
+    ("grafana/datasources.yml", validate_yaml_file),
+    ("grafana/dashboards.yml", validate_yaml_file),
+    
+    # HCL files
+    ("nomad/nomad.hcl", validate_hcl_file),
+    ("consul/consul.hcl", validate_hcl_file),
+    
+    # Python files
+    ("app/train.py", validate_python_file),
+    
+    # Dockerfile
+    ("app/Dockerfile", validate_dockerfile),
+]
 
-def validate_python_file(filepath):
-    """Validate Python file syntax"""
+# --watch results by path: ((mtime_ns, size) or None if missing, result row)
+_watch_cache = {}
+
+def run_validation(filepath, validator):
+    """Validate one file, returning a (filepath, status, message) row"""
+    if not os.path.exists(filepath):
+        return filepath, "❌ MISSING", "File not found"
+    
+    is_valid, message = validator(filepath)
+    status = "✅ PASS" if is_valid else "❌ FAIL"
+    return filepath, status, message
+
+def validate_if_changed(filepath, validator):
+    """Re-validate a file if it changed since its last --watch run; None when unchanged"""
     try:
-        with open(filepath, 'r') as f:
-            content = f.read()
-        
-        compile(content, filepath, 'exec')
-        return True, "Valid Python syntax"
-    except SyntaxError as e:
-        return False, f"Python Syntax Error: {e}"
-    except Exception as e:
-        return False, f"File Error: {e}"
+        stat = os.stat(filepath)
+        version = stat.st_mtime_ns, stat.st_size
+    except OSError:
+        version = None
+    
+    cached = _watch_cache.get(filepath)
+    if cached is not None and cached[0] == version:
+        return None
+    
+    if version is None:
+        row = filepath, "❌ MISSING", "File not found"
+    else:
+        # Bypass the shared validators' per-run cache, since files change under --watch
+        is_valid, message = getattr(validator, '__wrapped__', validator)(filepath)
+        row = filepath, ("✅ PASS" if is_valid else "❌ FAIL"), message
+    _watch_cache[filepath] = version, row
+    return row
 
-def validate_dockerfile(filepath):
-    """Basic Dockerfile validation"""
+def watch():
+    """Keep validating configuration files as they change, until interrupted"""
+    if Observer is None:
+        print("❌ --watch requires the watchdog package (pip install watchdog)")
+        return 1
+    
+    validators = dict(VALIDATIONS)
+    watched = {os.path.normpath(filepath): filepath for filepath in validators}
+    changed = queue.Queue()
+    
+    class ChangeHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            # Editors often save via a rename, so the destination counts too
+            for path in (event.src_path, getattr(event, 'dest_path', '')):
+                filepath = watched.get(os.path.normpath(path)) if path else None
+                if filepath is not None:
+                    changed.put(filepath)
+    
+    observer = Observer()
+    handler = ChangeHandler()
+    for dirname in {os.path.dirname(filepath) or '.' for filepath in validators}:
+        if os.path.isdir(dirname):
+            observer.schedule(handler, dirname, recursive=False)
+    observer.start()
+    
+    print("👀 Watching configuration files (Ctrl+C to stop)")
+    print("-" * 70)
     try:
-        with open(filepath, 'r') as f:
-            lines = f.readlines()
-        
-        has_from = any(line.strip().upper().startswith('FROM') for line in lines)
-        if not has_from:
-            return False, "Missing FROM instruction"
-        
-        return True, "Basic Dockerfile structure valid"
-    except Exception as e:
-        return False, f"File Error: {e}"
+        with ThreadPoolExecutor() as executor:
+            pending = list(validators)
+            while True:
+                rows = executor.map(lambda filepath: validate_if_changed(filepath, validators[filepath]), pending)
+                stamp = time.strftime('%H:%M:%S')
+                for row in rows:
+                    if row is not None:
+                        filepath, status, message = row
+                        print(f"[{stamp}] {status:<8} {filepath:<30} {message}")
+                
+                # A single save can fire several events; gather the burst first
+                pending = {changed.get()}
+                try:
+                    while True:
+                        pending.add(changed.get(timeout=0.1))
+                except queue.Empty:
+                    pass
+                pending = sorted(pending)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        observer.stop()
+        observer.join()
+    return 0
 
 def main():
     """Main validation function"""
     print("🔍 MLOps Infrastructure Configuration Validator")
     print("=" * 50)
     
-    # Define files to validate
-    validations = [
-        # JSON files
-        ("grafana/dashboard.json", validate_json_file),
-        
-        # YAML files  
-        ("docker-compose.yml", validate_yaml_file),
-        ("prometheus/prometheus.yml", validate_yaml_file),
-        ("grafana/datasources.yml", validate_yaml_file),
-        ("grafana/dashboards.yml", validate_yaml_file),
-        
-        # HCL files
-        ("nomad/nomad.hcl", validate_hcl_file),
-        ("consul/consul.hcl", validate_hcl_file),
-        
-        # Python files
-        ("app/train.py", validate_python_file),
-        
-        # Dockerfile
-        ("app/Dockerfile", validate_dockerfile),
-    ]
-    
-    all_valid = True
-    results = []
-    
-    for filepath, validator in validations:
-        if os.path.exists(filepath):
-            is_valid, message = validator(filepath)
-            status = "✅ PASS" if is_valid else "❌ FAIL"
-            results.append((filepath, status, message))
-            
-            if not is_valid:
-                all_valid = False
-        else:
-            results.append((filepath, "❌ MISSING", "File not found"))
-            all_valid = False
+    validations = VALIDATIONS
+    
+    # Each file is read and parsed independently, so validate them concurrently;
+    # map keeps the results in the order above
+    with ThreadPoolExecutor() as executor:
+        results = list(executor.map(lambda validation: run_validation(*validation), validations))
+    
+    all_valid = all(status == "✅ PASS" for _, status, _ in results)
     
     # Print results
     print("\n📋 Validation Results:")
@@ -138,7 +181,7 @@ def main():
     # Check for required files
     print(f"\n📄 File Count Check:")
     print("-" * 70)
-    total_files = len([f for f, _, _ in validations if os.path.exists(f)])
+    total_files = sum(1 for _, status, _ in results if status != "❌ MISSING")
     expected_files = len(validations)
     print(f"Files Found: {total_files}/{expected_files}")
     
@@ -156,4 +199,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(watch() if '--watch' in sys.argv[1:] else main())
\ No newline at end of file
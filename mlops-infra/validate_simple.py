@@ -4,20 +4,40 @@ MLOps Infrastructure Configuration Validator (No Dependencies)
 This script validates configuration files without requiring external packages.
 """
 
-import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 
-def validate_json_file(filepath):
-    """Validate JSON file syntax"""
-    try:
-        with open(filepath, 'r') as f:
-            json.load(f)
-        return True, "Valid JSON"
-    except json.JSONDecodeError as e:
-        return False, f"JSON Error: {e}"
-    except Exception as e:
-        return False, f"File Error: {e}"
+from _validators import validate_json_file, validate_hcl_file, validate_python_file, validate_dockerfile
+
+# A tab in a line's indentation, which YAML does not allow
+_TAB_INDENT = re.compile(r'^[ ]*\t', re.MULTILINE)
+
+# A line whose value opens a literal (|) or folded (>) block scalar
+_BLOCK_SCALAR_HEADER = re.compile(r'(?:^|[:?-][ \t])[ \t]*[|>][1-9+-]*[ \t]*(?:#.*)?$')
+
+def find_tab_indent(content):
+    """Return the line number of the first tab-indented line outside block scalars, or None"""
+    # One regex scan settles the common case of no tab-led lines at all
+    if not _TAB_INDENT.search(content):
+        return None
+    
+    block_indent = None  # Indentation of the open block scalar's header line
+    for line_number, line in enumerate(content.splitlines(), 1):
+        if not line.strip():
+            continue
+        stripped = line.lstrip(' ')
+        indent = len(line) - len(stripped)
+        if block_indent is not None:
+            # Lines indented past the header are block content, where tabs are literal text
+            if indent > block_indent:
+                continue
+            block_indent = None
+        if stripped.startswith('\t'):
+            return line_number
+        if not stripped.startswith('#') and _BLOCK_SCALAR_HEADER.search(line):
+            block_indent = indent
+    return None
 
 def validate_basic_yaml(filepath):
     """Basic YAML validation without PyYAML"""
@@ -25,14 +45,11 @@ def validate_basic_yaml(filepath):
         with open(filepath, 'r') as f:
             content = f.read()
         
-        # Basic checks
-        lines = content.split('\n')
-        for i, line in enumerate(lines, 1):
-            # Check for basic YAML structure issues
-            if line.strip() and not line.startswith('#'):
-                if line.lstrip() != line and not re.match(r'^[ ]+', line):
-                    continue  # Allow tabs for now
-                
+        # Basic check: YAML indentation must be spaces
+        line_number = find_tab_indent(content)
+        if line_number is not None:
+            return False, f"Tab used for indentation on line {line_number}"
+        
         return True, "Basic YAML structure appears valid"
     except Exception as e:
         return False, f"File Error: {e}"
@@ -61,57 +78,39 @@ def validate_docker_compose(filepath):
     except Exception as e:
         return False, f"File Error: {e}"
 
-def validate_hcl_file(filepath):
-    """Basic HCL file validation"""
-    try:
-        with open(filepath, 'r') as f:
-            content = f.read()
-        
-        # Basic syntax checks
-        if content.count('{') != content.count('}'):
-            return False, "Unmatched braces in HCL file"
-        
-        if content.count('"') % 2 != 0:
-            return False, "Unmatched quotes in HCL file"
-            
-        return True, "Basic HCL syntax appears valid"
-    except Exception as e:
-        return False, f"File Error: {e}"
+def build_file_index(dirnames):
+    """Scan each directory once, mapping dirname -> {entry name: DirEntry} (None if unreadable)"""
+    index = {}
+    for dirname in dirnames:
+        try:
+            with os.scandir(dirname) as entries:
+                index[dirname] = {entry.name: entry for entry in entries}
+        except OSError:
+            index[dirname] = None
+    return index
 
-def validate_python_file(filepath):
-    """Validate Python file syntax"""
-    try:
-        with open(filepath, 'r') as f:
-            content = f.read()
-        
-        compile(content, filepath, 'exec')
-        return True, "Valid Python syntax"
-    except SyntaxError as e:
-        return False, f"Python Syntax Error: {e}"
-    except Exception as e:
-        return False, f"File Error: {e}"
-
-def validate_dockerfile(filepath):
-    """Basic Dockerfile validation"""
-    try:
-        with open(filepath, 'r') as f:
-            lines = f.readlines()
-        
-        has_from = any(line.strip().upper().startswith('FROM') for line in lines)
-        if not has_from:
-            return False, "Missing FROM instruction"
-        
-        return True, "Basic Dockerfile structure valid"
-    except Exception as e:
-        return False, f"File Error: {e}"
+def lookup_file(index, filepath):
+    """Find a path's DirEntry in the directory index, or None if it does not exist"""
+    dirname, name = os.path.split(filepath)
+    entries = index.get(dirname or '.')
+    return entries.get(name) if entries else None
 
-def check_file_exists(filepath):
+def check_file_exists(filepath, index):
     """Check if file exists and get size"""
-    if os.path.exists(filepath):
-        size = os.path.getsize(filepath)
+    entry = lookup_file(index, filepath)
+    if entry is not None:
+        size = entry.stat().st_size
         return True, f"Exists ({size} bytes)"
     return False, "File not found"
 
+def run_validation(filepath, validator, index):
+    """Validate one file, returning its (status, message)"""
+    if lookup_file(index, filepath) is None:
+        return "❌ MISSING", "Cannot validate - file missing"
+    
+    is_valid, message = validator(filepath)
+    return ("✅ VALID" if is_valid else "❌ INVALID"), message
+
 def main():
     """Main validation function"""
     print("🔍 MLOps Infrastructure Configuration Validator")
@@ -137,11 +136,17 @@ def main():
         "PROJECT_SUMMARY.md"
     ]
     
+    required_dirs = ["app", "consul", "grafana", "nomad", "prometheus"]
+    
+    # One scandir per directory answers every existence, size and file-count
+    # question below, instead of a stat call per file
+    index = build_file_index({os.path.dirname(path) or '.' for path in files_to_check} | set(required_dirs))
+    
     print("📁 File Existence Check:")
     print("-" * 60)
     all_files_exist = True
     for filepath in files_to_check:
-        exists, info = check_file_exists(filepath)
+        exists, info = check_file_exists(filepath, index)
         status = "✅ EXISTS" if exists else "❌ MISSING"
         print(f"{status:<10} {filepath:<35} {info}")
         if not exists:
@@ -163,26 +168,24 @@ def main():
         ("app/Dockerfile", validate_dockerfile),
     ]
     
+    # Validators are independent, so run them concurrently and print in order
+    with ThreadPoolExecutor() as executor:
+        outcomes = list(executor.map(lambda validation: run_validation(*validation, index), validations))
+    
     all_valid = True
-    for filepath, validator in validations:
-        if os.path.exists(filepath):
-            is_valid, message = validator(filepath)
-            status = "✅ VALID" if is_valid else "❌ INVALID"
-            print(f"{status:<10} {filepath:<35} {message}")
-            if not is_valid:
-                all_valid = False
-        else:
-            print(f"❌ MISSING  {filepath:<35} Cannot validate - file missing")
+    for (filepath, _), (status, message) in zip(validations, outcomes):
+        print(f"{status:<10} {filepath:<35} {message}")
+        if status != "✅ VALID":
             all_valid = False
     
     # Directory structure check
     print(f"\n📂 Directory Structure:")
     print("-" * 60)
-    required_dirs = ["app", "consul", "grafana", "nomad", "prometheus"]
     dirs_ok = True
     for dirname in required_dirs:
-        if os.path.exists(dirname) and os.path.isdir(dirname):
-            file_count = len([f for f in os.listdir(dirname) if os.path.isfile(os.path.join(dirname, f))])
+        entries = index[dirname]
+        if entries is not None:
+            file_count = sum(1 for entry in entries.values() if entry.is_file())
             print(f"✅ EXISTS   {dirname}/ ({file_count} files)")
         else:
             print(f"❌ MISSING  {dirname}/")